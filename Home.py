@@ -1,21 +1,19 @@
 import streamlit as st
-import base64
+from genericbro.instrument import page_run
 
-# === Load and Encode Logo ===
-def get_base64_image(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
+run = page_run("home")
 
-# Load logo as base64
-logo_base64 = get_base64_image("logo.jpeg")
+# === Logo ===
+# static/logo.jpeg is Logo.jpeg pre-resized to 320 px (2x the displayed width) and served
+# by Streamlit's static file server (.streamlit/config.toml), so browsers cache it
+# instead of receiving it inlined as base64 on every rerun
+LOGO_URL = "app/static/logo.jpeg"
 
 # === STYLING ===
 st.markdown(f"""
 <style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap');
-
 html, body, [class*="css"] {{
-    font-family: 'Inter', sans-serif;
+    font-family: 'Inter', system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif;
     background-color: #f9fafa;
 }}
 
@@ -133,7 +131,7 @@ html, body, [class*="css"] {{
 
 <div class="container">
     <div style="text-align: center;">
-        <img src="data:image/jpeg;base64,{logo_base64}" class="logo" />
+        <img src="{LOGO_URL}" class="logo" width="160" height="160" alt="GenericBro logo" />
         <div class="main-title">GenericBro</div>
         <div class="subtitle">
             Affordable Healthcare at Your Fingertips.<br>
@@ -146,19 +144,23 @@ html, body, [class*="css"] {{
 # === FEATURE BUTTONS ===
 st.markdown('<div class="features-title">🔍 What can you do with GenericBro?</div>', unsafe_allow_html=True)
 
-col1, col2, col3 = st.columns(3)
+col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     if st.button("💊 Generic Medicine Finder"):
-        st.switch_page("generic_medicine.py")
+        st.switch_page("pages/Generic Medicine FInder.py")
 
 with col2:
     if st.button("📍 Pharmacy Locator"):
-        st.switch_page("pharmacy_locator.py")
+        st.switch_page("pages/Pharmacy Locator.py")
 
 with col3:
     if st.button("📝 Prescription Reader"):
-        st.switch_page("prescription_reader.py")
+        st.switch_page("pages/Prescription Reader.py")
+
+with col4:
+    if st.button("📊 Savings Analytics"):
+        st.switch_page("pages/Savings Analytics.py")
 
 # === GET STARTED ===
 st.markdown("""
@@ -168,6 +170,7 @@ st.markdown("""
         <li><b>Generic Medicine Finder</b>: Discover affordable alternatives.</li>
         <li><b>Pharmacy Locator</b>: Find nearby pharmacies with ease.</li>
         <li><b>Prescription Reader</b>: Upload prescriptions to extract medicine names.</li>
+        <li><b>Savings Analytics</b>: Compare savings by therapeutic type and formulation.</li>
     </ul>
 </div>
 """, unsafe_allow_html=True)
@@ -189,3 +192,4 @@ st.markdown("""
 
 # === Close container ===
 st.markdown('</div>', unsafe_allow_html=True)
+run.finish()
@@ -0,0 +1 @@
+"""Benchmarks for the GenericBro hot paths (``python -m benchmarks.run``)."""
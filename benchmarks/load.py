@@ -0,0 +1,333 @@
+"""Concurrent simulated sessions against a local Streamlit server, to size replicas.
+
+Starts ``streamlit run Home.py`` (or targets ``--url``). Each simulated session
+is a websocket client that speaks the browser's protocol and walks one scripted
+flow:
+
+- finder: Home, then the Generic Medicine FInder button, a search and paging
+- locator: Pharmacy Locator PIN search, then widening the radius
+- reader: Prescription Reader upload of a generated prescription image
+
+Every flow runs at rising concurrency for a fixed time. Latency is measured
+per rerun, from sending the widget states to the script finishing. The
+server's CPU and RSS are read from ``/proc``. The saturation point is the
+highest level before throughput stops growing (under ``--min-gain``) or p95
+rerun latency passes ``--budget-ms``::
+
+    python -m benchmarks.load --levels 1 2 4 8 16 --duration 20 -o load.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from benchmarks import synthetic
+
+PINS = ["500065", "110001", "560001", "400001", "600001", "700001"]
+FINISHED = (0, 1)  # FINISHED_SUCCESSFULLY, FINISHED_WITH_COMPILE_ERROR; 2 means a rerun follows
+
+
+class ServerStats:
+    """CPU seconds and RSS of a local server process, from ``/proc`` (Linux only)."""
+
+    def __init__(self, pid):
+        self.pid, self._tick = pid, os.sysconf("SC_CLK_TCK")
+
+    def cpu_s(self):
+        try:
+            with open(f"/proc/{self.pid}/stat") as fh:
+                fields = fh.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self._tick
+        except (OSError, TypeError):
+            return float("nan")
+
+    def rss_mb(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, TypeError):
+            pass
+        return float("nan")
+
+
+def sample_upload(seed=0) -> tuple:
+    """A prescription PNG rendered from catalogue names: ``(name, bytes, mime)``."""
+    from genericbro.catalogue import COL_NAME, read_catalogue
+
+    names = read_catalogue()[COL_NAME].dropna().tolist()
+    buf = io.BytesIO()
+    synthetic.prescription_image(synthetic.prescription_text(names, seed=seed)).save(buf, format="PNG")
+    return "prescription.png", buf.getvalue(), "image/png"
+
+
+class Session:
+    """One browser tab: a websocket, the widget values it has set and the last run's widgets."""
+
+    def __init__(self, url, flow, record):
+        self.url, self.flow, self._record = url.rstrip("/"), flow, record
+        self.ws = self.session_id = None
+        self.page_hash, self.states, self.widgets = "", {}, []
+
+    async def __aenter__(self):
+        from websockets.asyncio.client import connect
+
+        self.ws = await connect(self.url.replace("http", "ws", 1) + "/_stcore/stream", max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def _send(self, build):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        build(msg)
+        await self.ws.send(msg.SerializeToString())
+
+    async def _recv(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = ForwardMsg()
+        msg.ParseFromString(await self.ws.recv())
+        return msg
+
+    async def rerun(self, step, page_name="", triggers=()):
+        """Send the current widget values (plus one-shot ``triggers``) and wait for the script to finish."""
+        def build(msg):
+            cs = msg.rerun_script
+            cs.page_script_hash, cs.page_name = ("", page_name) if page_name else (self.page_hash, "")
+            cs.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+
+        start, failed = time.perf_counter(), False
+        await self._send(build)
+        while True:
+            msg = await self._recv()
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id or self.session_id
+                self.widgets = []
+            elif kind == "navigation" and msg.navigation.page_script_hash != self.page_hash:
+                # a new page (opened by name or via st.switch_page): the old page's widget values are gone
+                self.page_hash, self.states = msg.navigation.page_script_hash, {}
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                el = msg.delta.new_element
+                kind = el.WhichOneof("type")
+                failed |= kind == "exception"
+                if getattr(getattr(el, kind), "id", ""):
+                    self.widgets.append((kind, getattr(el, kind)))
+            elif kind == "script_finished" and msg.script_finished in FINISHED:
+                break
+        self._record(self.flow, step, (time.perf_counter() - start) * 1e3, failed)
+
+    def widget(self, kind, label=None, key=None):
+        for k, proto in self.widgets:
+            if k == kind and (label is None or proto.label == label) and (key is None or proto.id.endswith(key)):
+                return proto
+        raise LookupError(f"no {kind} {label or key!r} on page {self.page_hash[:8]}")
+
+    def set(self, kind, value_field, value, label=None, key=None):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        ws = WidgetState(id=self.widget(kind, label, key).id)
+        if isinstance(value, (list, tuple)):
+            getattr(ws, value_field).data[:] = value
+        else:
+            setattr(ws, value_field, value)
+        self.states[ws.id] = ws
+
+    def click(self, label=None, key=None):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        return WidgetState(id=self.widget("button", label, key).id, trigger_value=True)
+
+    async def upload(self, label, name, data, mime):
+        """Upload a file the way the browser does and select it in the ``label`` file uploader."""
+        import requests
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        request_id = uuid.uuid4().hex
+        def build(msg):
+            msg.file_urls_request.request_id = request_id
+            msg.file_urls_request.session_id = self.session_id
+            msg.file_urls_request.file_names.append(name)
+        await self._send(build)
+        while True:
+            msg = await self._recv()
+            if msg.WhichOneof("type") == "file_urls_response" and msg.file_urls_response.response_id == request_id:
+                urls = msg.file_urls_response.file_urls[0]
+                break
+        target = urls.upload_url if urls.upload_url.startswith("http") else self.url + urls.upload_url
+        resp = await asyncio.to_thread(requests.put, target, files={"file": (name, data, mime)}, timeout=60)
+        resp.raise_for_status()
+        ws = WidgetState(id=self.widget("file_uploader", label).id)
+        info = ws.file_uploader_state_value.uploaded_file_info.add()
+        info.name, info.size, info.file_id = name, len(data), urls.file_id
+        info.file_urls.CopyFrom(urls)
+        self.states[ws.id] = ws
+
+
+async def finder_flow(s, rng, upload):
+    await s.rerun("open")
+    await s.rerun("switch", triggers=[s.click("💊 Generic Medicine Finder")])
+    types = s.widget("selectbox", "Therapeutic Type").options
+    s.set("selectbox", "string_value", types[int(rng.integers(len(types)))], "Therapeutic Type")
+    await s.rerun("type")
+    await s.rerun("search", triggers=[s.click(key="search_btn")])
+    for page in (2, 3):
+        pager = [p for k, p in s.widgets if k == "number_input" and p.id.endswith("_page")]
+        if pager:
+            s.set("number_input", "double_value", float(min(page, pager[0].max)), key=pager[0].id)
+            await s.rerun("page")
+
+
+async def locator_flow(s, rng, upload):
+    await s.rerun("open", page_name="Pharmacy_Locator")
+    s.set("text_input", "string_value", PINS[int(rng.integers(len(PINS)))], "Enter 6-digit PIN code")
+    await s.rerun("pin")
+    await s.rerun("search", triggers=[s.click("🔍 Search")])
+    s.set("slider", "double_array_value", [float(rng.integers(5, 21))], "Search radius (km)")
+    await s.rerun("radius")
+
+
+async def reader_flow(s, rng, upload):
+    await s.rerun("open", page_name="Prescription_Reader")
+    await s.upload("Upload a prescription file", *upload)
+    await s.rerun("upload")
+
+
+FLOWS = {"finder": finder_flow, "locator": locator_flow, "reader": reader_flow}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies, self.errors = [], 0
+
+    def __call__(self, flow, step, ms, failed):
+        self.latencies.append(ms)
+        self.errors += failed
+
+
+async def run_level(url, stats, flow, sessions, duration, upload, seed=0) -> dict:
+    """``sessions`` concurrent tabs repeating ``flow`` for ``duration`` seconds."""
+    rec, deadline = Recorder(), time.perf_counter() + duration
+    rss_idle, peak = stats.rss_mb(), [stats.rss_mb()]
+
+    async def worker(i):
+        rng = np.random.default_rng(seed + i)
+        while time.perf_counter() < deadline:
+            # a new tab per iteration: fresh session state, shared process-wide caches
+            try:
+                async with Session(url, flow, rec) as s:
+                    await FLOWS[flow](s, rng, upload)
+                    peak[0] = max(peak[0], stats.rss_mb())
+            except Exception:
+                rec.errors += 1
+                await asyncio.sleep(0.1)
+
+    wall, cpu = time.perf_counter(), stats.cpu_s()
+    await asyncio.gather(*(worker(i) for i in range(sessions)))
+    wall, cpu = time.perf_counter() - wall, stats.cpu_s() - cpu
+
+    ms = np.array(rec.latencies) if rec.latencies else np.full(1, np.nan)
+    return {
+        "flow": flow, "sessions": sessions, "reruns": len(rec.latencies), "errors": rec.errors,
+        "reruns_per_s": round(len(rec.latencies) / wall, 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1), "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "cpu_cores": round(cpu / wall, 2), "cpu_ms_per_rerun": round(cpu * 1e3 / max(1, len(rec.latencies)), 1),
+        "rss_mb": round(peak[0], 1), "rss_mb_per_session": round(max(0.0, peak[0] - rss_idle) / sessions, 2),
+    }
+
+
+def saturation(levels, budget_ms, min_gain):
+    """Highest concurrency before throughput stops growing or p95 latency passes the budget."""
+    best = None
+    for prev, cur in zip([None] + levels[:-1], levels):
+        if cur["p95_ms"] > budget_ms or cur["errors"]:
+            break
+        if prev is not None and cur["reruns_per_s"] < prev["reruns_per_s"] * (1 + min_gain):
+            break
+        best = cur["sessions"]
+    return best
+
+
+def start_server(port):
+    env = {**os.environ, "GENERICBRO_REFRESH_SECONDS": "0"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "Home.py", "--server.headless", "true", "--server.port", str(port),
+         "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(300):
+        try:
+            socket.create_connection(("localhost", port), timeout=0.1).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("streamlit did not start")
+
+
+async def run(args):
+    url, pid, server = args.url, args.pid, None
+    if url is None:
+        server = start_server(args.port)
+        url, pid = f"http://localhost:{args.port}", server.pid
+    stats = ServerStats(pid)
+    upload = sample_upload()
+    report = {"url": url, "levels": [], "saturation": {}}
+    print(f"{'flow':8} {'sess':>4} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cpu':>5} "
+          f"{'cpu ms/run':>10} {'rss MB':>7} {'MB/sess':>8} {'err':>4}")
+    try:
+        for flow in args.flows:
+            async with Session(url, flow, Recorder()) as s:  # one pass to warm process caches
+                await FLOWS[flow](s, np.random.default_rng(0), upload)
+            levels = []
+            for n in args.levels:
+                r = await run_level(url, stats, flow, n, args.duration, upload)
+                levels.append(r)
+                print(f"{flow:8} {n:>4} {r['reruns_per_s']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                      f"{r['p99_ms']:>8.1f} {r['cpu_cores']:>5.2f} {r['cpu_ms_per_rerun']:>10.1f} {r['rss_mb']:>7.1f} "
+                      f"{r['rss_mb_per_session']:>8.2f} {r['errors']:>4}")
+            report["levels"] += levels
+            report["saturation"][flow] = saturation(levels, args.budget_ms, args.min_gain)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print("saturation (concurrent sessions per server process): "
+          + ", ".join(f"{f} {'-' if n is None else n}" for f, n in report["saturation"].items()))
+    return report
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS))
+    ap.add_argument("--levels", nargs="+", type=int, default=[1, 2, 4, 8, 16], help="concurrent sessions to try")
+    ap.add_argument("--duration", type=float, default=15, help="seconds per level")
+    ap.add_argument("--budget-ms", type=float, default=1000, help="p95 rerun latency that counts as saturated")
+    ap.add_argument("--min-gain", type=float, default=0.1, help="throughput growth a level must add over the last")
+    ap.add_argument("--port", type=int, default=8599, help="port for the server this tool starts")
+    ap.add_argument("--url", help="drive an already running server instead (XSRF protection off for uploads)")
+    ap.add_argument("--pid", type=int, help="process id of the --url server, for CPU and RSS")
+    ap.add_argument("-o", "--output", help="write the JSON results here")
+    args = ap.parse_args(argv)
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
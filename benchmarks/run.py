@@ -0,0 +1,213 @@
+"""Time every hot path at 1×, 10× and 100× data and write a comparable JSON report.
+
+    python -m benchmarks.run -o bench.json
+    python -m benchmarks.run --scales 1 10 --compare bench.json
+
+Each stage reports p50/p95 latency over ``--repeat`` runs and its peak Python
+heap (tracemalloc, measured in one extra untimed run).
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks import synthetic
+from genericbro.analytics import SavingsSummary
+from genericbro.catalogue import COL_DOSAGE, COL_NAME, COL_PRICE_GENERIC, COL_SAVE_PCT, read_catalogue
+from genericbro.dosage import parse_dosages
+from genericbro.equivalence import FormulationGroups
+from genericbro.export import RENDERERS, export
+from genericbro.fulltext import FullTextIndex
+from genericbro.geo import StoreIndex
+from genericbro.listing import nav_links, store_table
+from genericbro.match import MedicineMatcher
+from genericbro.ocr import ocr_image_bytes, preprocess
+from genericbro.places import PlaceIndex
+from genericbro.prescription import clean_lines
+from genericbro.query import CatalogueQuery, page_slice
+from genericbro.refresh import CATALOGUE, apply_delta
+from genericbro.snapshot import read_snapshot, write_snapshot
+from genericbro.stores import read_stores
+from genericbro.suggest import Suggester
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"p50_ms": round(float(np.percentile(times, 50)), 4), "p95_ms": round(float(np.percentile(times, 95)), 4),
+            "peak_kb": round(peak / 1024, 1), "repeat": repeat}
+
+
+def cycling(items):
+    """A zero-arg callable returning the next item each call, so repeats vary their input."""
+    it = iter(items)
+    state = {"it": it}
+
+    def nxt():
+        try:
+            return next(state["it"])
+        except StopIteration:
+            state["it"] = iter(items)
+            return next(state["it"])
+    return nxt
+
+
+def stages(scale, workdir, repeat, seed=0):
+    """Yield ``(stage, rows, fn)`` for one data scale."""
+    rng = random.Random(seed)
+    cat_csv, store_csv = workdir / f"Final_x{scale}.csv", workdir / f"GenericP_x{scale}.csv"
+    synthetic.catalogue(scale, seed).to_csv(cat_csv, index=False)
+    synthetic.stores(scale, seed).to_csv(store_csv, index=False)
+
+    df = read_catalogue(cat_csv)
+    write_snapshot(df, cat_csv, workdir)
+    yield "catalogue.read_csv", len(df), lambda: read_catalogue(cat_csv)
+    yield "catalogue.read_snapshot", len(df), lambda: read_snapshot(cat_csv, workdir)
+    yield "catalogue.parse_dosage", len(df), lambda: parse_dosages(df[COL_DOSAGE])
+
+    # a price-list update touching 1% of rows, diffed and applied against the live table
+    updated = df.copy()
+    changed = updated.sample(frac=0.01, random_state=seed).index
+    updated.loc[changed, COL_PRICE_GENERIC] = updated.loc[changed, COL_PRICE_GENERIC] * 1.1
+    yield "refresh.price_delta", len(df), lambda: apply_delta(df, updated, CATALOGUE.key)
+
+    groups = FormulationGroups(df)
+    yield "catalogue.build_indexes", len(df), lambda: CatalogueQuery(df, FormulationGroups(df))
+    engine = CatalogueQuery(df, groups)
+    names = df[COL_NAME].dropna().tolist()
+    types = engine.types
+    states = [(rng.choice([None] + types), None, rng.choice([None, rng.choice(names)]), None,
+               rng.choice([COL_PRICE_GENERIC, COL_SAVE_PCT]), rng.random() < 0.5) for _ in range(64)]
+    nxt_state = cycling(states)
+    yield "query.search_uncached", len(df), lambda: engine._search(*nxt_state())
+    yield "query.search_cached", len(df), lambda: engine.search(*states[0])
+    yield "query.options", len(df), lambda: engine._options("name", rng.choice(types))
+    yield "analytics.build", len(df), lambda: SavingsSummary(df, groups)
+    summary = SavingsSummary(df, groups)
+    drill = [(t, k) for t in summary.types["Type"] for k in summary.formulations(t).index[:8]]
+    yield "analytics.drill", len(df), lambda: summary.products(*rng.choice(drill))
+    yield "query.strength_range", len(df), lambda: engine.strength.range(*sorted(rng.sample([1, 10, 50, 100, 500, 1000], 2)))
+
+    all_rows = engine.search(None, None, None, None, COL_PRICE_GENERIC, True).hits
+    pages = max(1, len(all_rows) // 10)
+    cols = ["Name", "Formulation", "Dosage", "Cost of generic", "Cost of branded", "Savings"]
+    yield "table.page_slice", len(df), lambda: df.iloc[page_slice(all_rows, rng.randint(1, pages), 10)[2]][cols]
+
+    text_index = FullTextIndex(df)
+    words = ["amlo", "blood pressure", "paracet 500", "diabet", "headache nausea", "ecosp", "infection", "tab"]
+    yield "fulltext.build", len(df), lambda: FullTextIndex(df)
+    yield "fulltext.search_page", len(df), lambda: text_index.search(rng.choice(words), limit=10)
+
+    suggester = Suggester(df)
+    prefixes = [n[:k] for n in rng.sample(names, 16) for k in (1, 2, 4)] + ["tab", "tab am"]
+    yield "suggest.build", len(df), lambda: Suggester(df)
+    yield "suggest.complete", len(df), lambda: suggester._complete(rng.choice(["name", "formulation"]), rng.choice(prefixes),
+                                                                    rng.choice([None] + types))
+
+    matcher = MedicineMatcher(df[COL_NAME])
+    texts = [clean_lines(synthetic.prescription_text(names[:5000], seed=i)) for i in range(32)]
+    nxt_text = cycling(texts)
+    yield "match.build", len(df), lambda: MedicineMatcher(df[COL_NAME])
+    yield "match.prescription", len(df), lambda: (matcher.best.cache_clear(), matcher.match_lines(nxt_text()))
+
+    sdf = read_stores(store_csv)
+    index = StoreIndex.from_frame(sdf)
+    points = [(float(a) + rng.uniform(-0.05, 0.05), float(b) + rng.uniform(-0.05, 0.05))
+              for a, b in sdf[["lat", "lon"]].sample(64, replace=True, random_state=seed).to_numpy()]
+    nxt_point = cycling(points)
+    yield "stores.build_grid", len(sdf), lambda: StoreIndex.from_frame(sdf)
+    yield "stores.radius_5km", len(sdf), lambda: index.radius(*nxt_point(), 5)
+    yield "stores.radius_20km", len(sdf), lambda: index.radius(*nxt_point(), 20)
+    yield "stores.nearest_10", len(sdf), lambda: index.nearest(*nxt_point(), 10)
+
+    places = PlaceIndex(sdf)
+    cities = list(places.city_keys)
+    yield "places.build", len(sdf), lambda: PlaceIndex(sdf)
+    yield "places.city", len(sdf), lambda: places.city(rng.choice(cities))
+    yield "places.suggest", len(sdf), lambda: places.suggest_cities(rng.choice(cities)[:2])
+    yield "places.pin_centre", len(sdf), lambda: places.centre(rng.choice(sdf["pin"].tolist()))
+
+    pos, dist = index.radius(*points[0], 20)
+    rows = index.select(sdf, pos, dist).head(200)
+    yield "listing.page_25", 25, lambda: store_table(rows.iloc[:25], nav_links(rows.iloc[:25], *points[0]))
+    for fmt, render in RENDERERS.items():
+        yield f"export.{fmt}", len(rows), lambda render=render: render(rows)
+    export(rows, "pdf")
+    yield "export.cached", len(rows), lambda: export(rows, "pdf")
+
+    if scale == 1:
+        page = synthetic.prescription_image(synthetic.prescription_text(names, seed=seed))
+        photo = page.rotate(2.5, expand=True, fillcolor=255).resize((3000, 4200))
+        yield "ocr.preprocess_photo", 1, lambda: preprocess(photo)
+        if shutil.which("tesseract"):
+            buf = io.BytesIO()
+            photo.save(buf, "PNG")
+            data = buf.getvalue()
+            yield "ocr.photo_page", 1, lambda: ocr_image_bytes(data)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_path):
+    base = {(r["stage"], r["scale"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"{'stage':32} {'scale':>5} {'p50 ms':>10} {'base':>10} {'ratio':>7}")
+    for r in report["results"]:
+        b = base.get((r["stage"], r["scale"]))
+        ratio = f"{r['p50_ms'] / b['p50_ms']:.2f}x" if b and b["p50_ms"] else "new"
+        print(f"{r['stage']:32} {r['scale']:>5} {r['p50_ms']:>10.3f} {b['p50_ms'] if b else '':>10} {ratio:>7}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--only", help="run only stages whose name contains this text")
+    ap.add_argument("-o", "--output", help="write the JSON report here (default: stdout)")
+    ap.add_argument("--compare", help="earlier JSON report to compare p50 latencies against")
+    args = ap.parse_args(argv)
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            for stage, rows, fn in stages(scale, Path(tmp), args.repeat):
+                if args.only and args.only not in stage:
+                    continue
+                result = {"stage": stage, "scale": scale, "rows": rows, **measure(fn, args.repeat)}
+                report["results"].append(result)
+                print(f"{stage:32} x{scale:<4} p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms  "
+                      f"peak {result['peak_kb']:9.1f} KB", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
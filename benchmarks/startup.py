@@ -0,0 +1,96 @@
+"""Cold-start and page-switch script time per page, checked against a budget.
+
+Each page runs in a fresh interpreter (after ``import streamlit``, which every
+server pays once): the first run is the cold start (imports, snapshot loads,
+index builds); a second session opening the same page is the page switch, with
+process caches warm. Exits 1 when any median exceeds its budget::
+
+    python -m benchmarks.startup --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# (cold start, page switch) budgets in ms for one script run, net of AppTest overhead and without
+# browser rendering
+BUDGETS_MS = {
+    "Home.py": (300, 50),
+    "pages/Generic Medicine FInder.py": (1000, 100),
+    "pages/Prescription Reader.py": (1000, 100),
+    "pages/Pharmacy Locator.py": (1000, 100),
+    "pages/Savings Analytics.py": (1000, 100),
+}
+
+
+def _run(path):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.abspath(path), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise SystemExit(f"{path}: {at.exception[0].value}")
+    return (time.perf_counter() - start) * 1e3
+
+
+def child(page):
+    # AppTest itself costs ~100+ ms per run; time an empty script and report page time net of it
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as fh:
+        fh.write("import streamlit as st\n")
+    try:
+        overhead = min(_run(fh.name) for _ in range(3))
+    finally:
+        os.unlink(fh.name)
+    cold, switch = _run(page) - overhead, _run(page) - overhead
+    modules = sorted(m for m in ("folium", "streamlit_folium", "reportlab", "pytesseract", "pdf2image", "xlsxwriter")
+                     if m in sys.modules)
+    print(json.dumps({"cold_ms": max(cold, 0.0), "switch_ms": max(switch, 0.0), "heavy_modules": modules}))
+
+
+def measure(page, repeat):
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child", page],
+                              capture_output=True, text=True, check=True)
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {
+        "page": page,
+        "cold_ms": round(statistics.median(r["cold_ms"] for r in runs), 1),
+        "switch_ms": round(statistics.median(r["switch_ms"] for r in runs), 1),
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters per page")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("-o", "--output", help="write the JSON results here")
+    args = ap.parse_args(argv)
+    if args.child:
+        child(args.child)
+        return 0
+
+    results, over = [], False
+    print(f"{'page':36} {'cold ms':>9} {'budget':>7} {'switch ms':>10} {'budget':>7}  heavy imports")
+    for page, (cold_budget, switch_budget) in BUDGETS_MS.items():
+        r = measure(page, args.repeat)
+        r["over_budget"] = r["cold_ms"] > cold_budget or r["switch_ms"] > switch_budget
+        over |= r["over_budget"]
+        results.append(r)
+        flag = "  OVER" if r["over_budget"] else ""
+        print(f"{page:36} {r['cold_ms']:>9.1f} {cold_budget:>7} {r['switch_ms']:>10.1f} {switch_budget:>7}  "
+              f"{','.join(r['heavy_modules']) or '-'}{flag}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
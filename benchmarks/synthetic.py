@@ -0,0 +1,81 @@
+"""Synthetic scale-ups of ``Final.csv`` and ``GenericP.csv`` plus prescription text/images."""
+import random
+import string
+
+import numpy as np
+import pandas as pd
+
+from genericbro.catalogue import CATALOGUE_PATH, COL_NAME
+from genericbro.stores import STORES_PATH
+
+FILLER = "take once daily after food for days morning night bd od tds sos review after week".split()
+
+
+def _suffixes(n, rng):
+    letters = np.array(list(string.ascii_uppercase))
+    return ["".join(s) for s in rng.choice(letters, size=(n, 3))]
+
+
+def catalogue(scale, seed=0, path=CATALOGUE_PATH) -> pd.DataFrame:
+    """``Final.csv`` repeated ``scale`` times; copies get new brand names and jittered prices."""
+    base = pd.read_csv(path)
+    if scale <= 1:
+        return base
+    rng = np.random.default_rng(seed)
+    frames = [base]
+    for i in range(1, int(scale)):
+        copy = base.copy()
+        copy[COL_NAME] = copy[COL_NAME].astype(str) + " " + _suffixes(len(copy), rng)
+        for col in ("Cost of branded", "Cost of generic"):
+            copy[col] = pd.to_numeric(copy[col], errors="coerce") * rng.uniform(0.8, 1.2, len(copy))
+        frames.append(copy)
+    return pd.concat(frames, ignore_index=True)
+
+
+def stores(scale, seed=0, path=STORES_PATH) -> pd.DataFrame:
+    """``GenericP.csv`` repeated ``scale`` times with coordinates jittered by up to ~20 km."""
+    base = pd.read_csv(path)
+    if scale <= 1:
+        return base
+    rng = np.random.default_rng(seed)
+    frames = [base]
+    for i in range(1, int(scale)):
+        copy = base.copy()
+        copy["Kendra Code"] = copy["Kendra Code"].astype(str) + f"-{i}"
+        copy["lat"] = copy["lat"] + rng.uniform(-0.2, 0.2, len(copy))
+        copy["lon"] = copy["lon"] + rng.uniform(-0.2, 0.2, len(copy))
+        frames.append(copy)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _typo(word, rng):
+    if len(word) < 4 or rng.random() < 0.5:
+        return word
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def prescription_text(names, lines=12, seed=0) -> str:
+    """A prescription-like text mixing catalogue names (some misspelt) with filler words."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(lines):
+        name = " ".join(_typo(w, rng) for w in str(rng.choice(names)).lower().split())
+        out.append(f"{rng.randint(1, 9)}. {name} {rng.choice(['1mg', '500 mg', '10mg'])} " + " ".join(rng.sample(FILLER, 4)))
+    return "\n".join(out)
+
+
+def prescription_image(text, width=1240):
+    """Render ``text`` black-on-white like a scanned A4 page at ~150 DPI."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    lines = text.splitlines()
+    img = Image.new("L", (width, max(1754, 60 * len(lines) + 200)), 255)
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.load_default(size=32)
+    except TypeError:
+        font = ImageFont.load_default()
+    for i, line in enumerate(lines):
+        draw.text((100, 100 + 60 * i), line, fill=0, font=font)
+    return img
@@ -0,0 +1 @@
+"""Shared, Streamlit-free core for the GenericBro pages."""
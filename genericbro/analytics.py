@@ -0,0 +1,69 @@
+"""Savings aggregates per therapeutic type and per formulation, materialized once per catalogue version.
+
+Formulations are grouped by :func:`genericbro.equivalence.formulation_key`, like
+the Finder's same-formulation lists. Each drill-down step is a dict lookup into
+these tables::
+
+    summary = SavingsSummary(df, FormulationGroups(df))
+    summary.types                          # one row per type
+    forms = summary.formulations("B - Anti Hypertensive")
+    rows = summary.products("B - Anti Hypertensive", forms.index[0])
+"""
+import numpy as np
+import pandas as pd
+
+from genericbro.catalogue import COL_DOSAGE, COL_FORMULATION, COL_NAME, COL_PRICE_GENERIC, COL_SAVE_PCT, COL_TYPE
+
+TYPE_COLS = ["Type", "Products", "Formulations", "Median savings %", "Max savings %"]
+FORM_COLS = ["Formulation", "Products", "Median savings %", "Max savings %", "Cheapest generic", "Dosage", "Generic ₹"]
+
+
+def _frozen(a) -> np.ndarray:
+    a = np.asarray(a, dtype=np.intp)
+    a.flags.writeable = False
+    return a
+
+
+class SavingsSummary:
+    def __init__(self, df: pd.DataFrame, groups):
+        frame = pd.DataFrame({
+            "type": df[COL_TYPE].astype(object).to_numpy(),
+            "form": np.where(groups.keys == "", None, groups.keys),
+            "save": df[COL_SAVE_PCT].to_numpy(dtype=np.float64),
+            "price": df[COL_PRICE_GENERIC].to_numpy(dtype=np.float64),
+            "pos": np.arange(len(df)),
+        })
+        frame = frame[frame["type"].notna()].sort_values(["type", "form", "price"], na_position="last", kind="stable")
+        self.overall = {"products": len(df), "median_savings_pct": float(frame["save"].median()),
+                        "max_savings_pct": float(frame["save"].max())}
+
+        self.types = frame.groupby("type", sort=True).agg(
+            products=("pos", "size"), formulations=("form", "nunique"), median=("save", "median"), max=("save", "max"),
+        ).reset_index()
+        self.types.columns = TYPE_COLS
+
+        # rows are sorted cheapest generic first within each (type, formulation), so "first" is the cheapest
+        formulated = frame[frame["form"].notna()]
+        grouped = formulated.groupby(["type", "form"], sort=False)
+        forms = grouped.agg(products=("pos", "size"), median=("save", "median"), max=("save", "max"), cheapest=("pos", "first"))
+        cheapest = df.iloc[forms["cheapest"].to_numpy()]
+        forms = pd.DataFrame({
+            "Formulation": cheapest[COL_FORMULATION].astype(object).to_numpy(),
+            "Products": forms["products"].to_numpy(), "Median savings %": forms["median"].to_numpy(),
+            "Max savings %": forms["max"].to_numpy(), "Cheapest generic": cheapest[COL_NAME].astype(object).to_numpy(),
+            "Dosage": cheapest[COL_DOSAGE].astype(object).to_numpy(),
+            "Generic ₹": cheapest[COL_PRICE_GENERIC].to_numpy(dtype=np.float64),
+        }, index=forms.index)
+        self._forms = {typ: part.droplevel(0).sort_values("Median savings %", ascending=False, kind="stable")
+                       for typ, part in forms.groupby(level=0, sort=False)}
+
+        pos = formulated["pos"].to_numpy()  # .indices are positions into the grouped frame
+        self._products = {key: _frozen(pos[idx]) for key, idx in grouped.indices.items()}
+
+    def formulations(self, typ) -> pd.DataFrame:
+        """One row per formulation of ``typ``, indexed by formulation key, best median saving first."""
+        return self._forms.get(typ, pd.DataFrame(columns=FORM_COLS))
+
+    def products(self, typ, key) -> np.ndarray:
+        """Catalogue row positions of one formulation within ``typ``, cheapest generic first."""
+        return self._products.get((typ, key), _frozen([]))
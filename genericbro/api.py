@@ -0,0 +1,222 @@
+"""Async JSON API over the catalogue, alternatives, savings analytics, prescription matching and store search.
+
+Indexes are built once per process at startup; OCR runs in the shared process
+pool so it never blocks the event loop. Run with::
+
+    python -m genericbro.api --port 8000 --workers 4
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from genericbro.core import SORTS, Core
+from genericbro.export import FORMATS, available, export, iter_csv
+from genericbro.cache import shared_cache
+from genericbro.ocr import DEFAULT_DPI, DEFAULT_MAX_PAGES, cached_ocr_document, executor
+from genericbro.suggest import SUGGESTIONS
+
+MAX_PAGE_SIZE = 100
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+
+def _core(request) -> Core:
+    return request.app.state.core
+
+
+def _arg(request, name, cast=str, default=None, lo=None, hi=None):
+    raw = request.query_params.get(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        raise HTTPException(400, f"invalid {name!r}: {raw!r}")
+    if (lo is not None and value < lo) or (hi is not None and value > hi):
+        raise HTTPException(400, f"{name!r} out of range")
+    return value
+
+
+def _row(request, core) -> int:
+    row = int(request.path_params["row"])
+    if not 0 <= row < len(core.catalogue):
+        raise HTTPException(404, "no such medicine")
+    return row
+
+
+async def health(request):
+    core = _core(request)
+    return JSONResponse({"status": "ok", "medicines": len(core.catalogue), "stores": len(core.stores),
+                         "versions": core.versions(), "cache": shared_cache().stats()})
+
+
+def _filters(request) -> dict:
+    sort = _arg(request, "sort", default="generic")
+    if sort not in SORTS:
+        raise HTTPException(400, f"sort must be one of {sorted(SORTS)}")
+    lo, hi = _arg(request, "min_strength", float, lo=0), _arg(request, "max_strength", float, lo=0)
+    return dict(
+        typ=_arg(request, "type"), dosage=_arg(request, "dosage"),
+        name=_arg(request, "name"), formulation=_arg(request, "formulation"),
+        sort=sort, ascending=_arg(request, "order", default="asc") != "desc",
+        strength=None if lo is None and hi is None else (_arg(request, "unit", default="mg"), lo, hi),
+        same_strength=_arg(request, "same_strength", default="") in ("1", "true", "yes"),
+    )
+
+
+async def medicines(request):
+    return JSONResponse(_core(request).search(
+        **_filters(request),
+        page=_arg(request, "page", int, 1, lo=1),
+        page_size=_arg(request, "page_size", int, 20, lo=1, hi=MAX_PAGE_SIZE),
+    ))
+
+
+async def medicines_text(request):
+    q = _arg(request, "q")
+    if not q:
+        raise HTTPException(400, "q is required")
+    return JSONResponse(_core(request).text_search(
+        q, _arg(request, "type"),
+        page=_arg(request, "page", int, 1, lo=1),
+        page_size=_arg(request, "page_size", int, 20, lo=1, hi=MAX_PAGE_SIZE),
+    ))
+
+
+async def medicines_suggest(request):
+    kind = _arg(request, "kind", default="name")
+    if kind not in ("name", "formulation"):
+        raise HTTPException(400, "kind must be 'name' or 'formulation'")
+    return JSONResponse(_core(request).suggest(
+        _arg(request, "q", default=""), kind, _arg(request, "type"), _arg(request, "limit", int, SUGGESTIONS, lo=1, hi=50),
+    ))
+
+
+async def medicines_export(request):
+    fmt = _arg(request, "format", default="csv")
+    if fmt not in FORMATS or not available(fmt):
+        raise HTTPException(400, f"format must be one of {sorted(f for f in FORMATS if available(f))}")
+    frame = _core(request).search_frame(**_filters(request))
+    mime, ext = FORMATS[fmt]
+    headers = {"Content-Disposition": f'attachment; filename="medicines.{ext}"'}
+    if fmt == "csv":
+        return StreamingResponse(iter_csv(frame), media_type=mime, headers=headers)
+    data = await asyncio.get_running_loop().run_in_executor(None, export, frame, fmt)
+    return Response(data, media_type=mime, headers=headers)
+
+
+async def medicine(request):
+    core = _core(request)
+    return JSONResponse(core.medicine(_row(request, core)))
+
+
+async def alternatives(request):
+    core = _core(request)
+    return JSONResponse(core.alternatives(_row(request, core), _arg(request, "limit", int, 20, lo=1, hi=MAX_PAGE_SIZE)))
+
+
+async def match_text(request):
+    try:
+        body = await request.json()
+        text = body["text"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(400, 'expected JSON body {"text": "..."}')
+    return JSONResponse(_core(request).match_text(str(text), _arg(request, "cutoff", float, 0.85, lo=0, hi=1)))
+
+
+async def match_upload(request):
+    kind = request.headers.get("content-type", "").split(";")[0].strip()
+    if kind != "application/pdf" and not kind.startswith("image/"):
+        raise HTTPException(415, "send the raw PDF or image with its Content-Type")
+    data = await request.body()
+    if not data or len(data) > MAX_UPLOAD_BYTES:
+        raise HTTPException(413 if data else 400, "empty or oversized upload")
+    dpi = _arg(request, "dpi", int, DEFAULT_DPI, lo=72, hi=600)
+    max_pages = _arg(request, "max_pages", int, DEFAULT_MAX_PAGES, lo=1, hi=50)
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        ocr = await loop.run_in_executor(None, lambda: cached_ocr_document(data, kind == "application/pdf", dpi, max_pages))
+    except Exception as e:
+        raise HTTPException(422, f"could not extract text: {e}")
+    result = _core(request).match_text(ocr.confident_text())
+    result.update(digest=ocr.digest, pages=[{"page": p.page, "seconds": round(p.seconds, 3)} for p in ocr.pages],
+                  seconds=round(time.perf_counter() - start, 3))
+    return JSONResponse(result)
+
+
+async def pharmacies_nearby(request):
+    lat = _arg(request, "lat", float, lo=-90, hi=90)
+    lon = _arg(request, "lon", float, lo=-180, hi=180)
+    if lat is None or lon is None:
+        raise HTTPException(400, "lat and lon are required")
+    return JSONResponse(_core(request).nearby(
+        lat, lon, radius_km=_arg(request, "radius_km", float, lo=0, hi=500), k=_arg(request, "k", int, lo=1, hi=MAX_PAGE_SIZE),
+        limit=_arg(request, "limit", int, MAX_PAGE_SIZE, lo=1, hi=1000),
+    ))
+
+
+async def pharmacies(request):
+    pin, city, area = _arg(request, "pin"), _arg(request, "city"), _arg(request, "area")
+    if not (pin or city or area):
+        raise HTTPException(400, "one of pin, city or area is required")
+    return JSONResponse(_core(request).stores_by(pin, city, area, limit=_arg(request, "limit", int, MAX_PAGE_SIZE, lo=1, hi=1000)))
+
+
+async def savings(request):
+    return JSONResponse(_core(request).savings(
+        _arg(request, "type"), _arg(request, "formulation"), limit=_arg(request, "limit", int, MAX_PAGE_SIZE, lo=1, hi=1000),
+    ))
+
+
+async def _http_error(request, exc):
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code)
+
+
+def create_app(core: Core = None) -> Starlette:
+    async def lifespan(app):
+        app.state.core = core or await asyncio.get_running_loop().run_in_executor(None, Core)
+        yield
+        if core is None:
+            executor().shutdown(wait=False, cancel_futures=True)
+
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/medicines", medicines),
+            Route("/medicines/search", medicines_text),
+            Route("/medicines/suggest", medicines_suggest),
+            Route("/medicines/export", medicines_export),
+            Route("/medicines/{row:int}", medicine),
+            Route("/medicines/{row:int}/alternatives", alternatives),
+            Route("/prescriptions/match", match_text, methods=["POST"]),
+            Route("/prescriptions/ocr", match_upload, methods=["POST"]),
+            Route("/pharmacies", pharmacies),
+            Route("/pharmacies/nearby", pharmacies_nearby),
+            Route("/analytics/savings", savings),
+        ],
+        exception_handlers={HTTPException: _http_error},
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
+
+
+def main(argv=None):
+    import uvicorn
+
+    ap = argparse.ArgumentParser(prog="python -m genericbro.api", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=1, help="server processes, each holding its own indexes")
+    args = ap.parse_args(argv)
+    uvicorn.run("genericbro.api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Headless batch prescription processing.
+
+Walks a directory, ``.zip`` or ``.tar[.gz]`` of PDF/PNG/JPEG prescriptions, runs
+OCR → clean lines → catalogue match across a process pool and streams one JSON
+line per document. Documents already processed successfully in the output file
+are skipped (failed ones are retried), so an interrupted run resumes where it
+stopped::
+
+    python -m genericbro.batch scans/ -o results.jsonl --workers 8
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from genericbro.catalogue import CATALOGUE_PATH, COL_NAME, read_catalogue
+from genericbro.equivalence import FormulationGroups
+from genericbro.match import MedicineMatcher
+from genericbro.ocr import DEFAULT_DPI, DEFAULT_MAX_PAGES, cached_ocr_document
+from genericbro.prescription import clean_lines, match_positions, summarize
+from genericbro.snapshot import load_snapshot
+
+SUFFIXES = {".pdf", ".png", ".jpg", ".jpeg"}
+
+_worker = {}
+
+
+def iter_sources(root, skip=()):
+    """``(source_id, path, member, data)`` for every prescription under ``root`` not in ``skip``.
+
+    Tar members have no index to seek by (and ``.tar.gz`` must be decompressed
+    from the start), so their bytes are read as the walk reaches them; ``data`` is
+    ``None`` for everything else, which :func:`read_source` opens by name.
+    """
+    root = Path(root)
+    if root.is_dir():
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() in SUFFIXES and str(path.relative_to(root)) not in skip:
+                yield str(path.relative_to(root)), str(path), None, None
+    elif zipfile.is_zipfile(root):
+        with zipfile.ZipFile(root) as zf:
+            for name in sorted(zf.namelist()):
+                if Path(name).suffix.lower() in SUFFIXES and name not in skip:
+                    yield name, str(root), name, None
+    elif tarfile.is_tarfile(root):
+        with tarfile.open(root) as tf:
+            for m in tf:
+                if m.isfile() and Path(m.name).suffix.lower() in SUFFIXES and m.name not in skip:
+                    yield m.name, str(root), m.name, tf.extractfile(m).read()
+    elif root.suffix.lower() in SUFFIXES:
+        if root.name not in skip:
+            yield root.name, str(root), None, None
+    else:
+        raise ValueError(f"not a directory, archive or prescription file: {root}")
+
+
+def read_source(path, member):
+    """Bytes of a file, or of a ``.zip`` member (tar members come with their bytes from :func:`iter_sources`)."""
+    if member is None:
+        return Path(path).read_bytes()
+    with zipfile.ZipFile(path) as zf:
+        return zf.read(member)
+
+
+def _init_worker(catalogue_path):
+    df = load_snapshot(catalogue_path, read_catalogue)
+    _worker.update(df=df, matcher=MedicineMatcher(df[COL_NAME]), groups=FormulationGroups(df))
+
+
+def process(source, path, member, data=None, dpi=DEFAULT_DPI, max_pages=DEFAULT_MAX_PAGES, cutoff=0.85) -> dict:
+    start = time.perf_counter()
+    record = {"source": source}
+    try:
+        if data is None:
+            data = read_source(path, member)
+        ocr = cached_ocr_document(data, Path(source).suffix.lower() == ".pdf", dpi=dpi, max_pages=max_pages, parallel=False)
+        positions = match_positions(clean_lines(ocr.confident_text()), _worker["matcher"], cutoff)
+        record.update(digest=ocr.digest, pages=len(ocr.pages), ocr_seconds=round(ocr.seconds, 3))
+        record.update(summarize(positions, _worker["df"], _worker["groups"]))
+    except Exception as e:  # one bad scan must not stop the batch
+        record.update(error=f"{type(e).__name__}: {e}", pages=0)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def done_sources(output) -> set:
+    """Sources already written to ``output`` without an error; a torn last line is ignored."""
+    done = set()
+    if output and os.path.exists(output):
+        with open(output, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                    if "error" not in record:
+                        done.add(record["source"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return done
+
+
+def run(root, output=None, workers=None, dpi=DEFAULT_DPI, max_pages=DEFAULT_MAX_PAGES, cutoff=0.85,
+        catalogue_path=CATALOGUE_PATH, log=sys.stderr) -> dict:
+    done = done_sources(output)
+    workers = workers or os.cpu_count() or 1
+    sources = iter_sources(root, done)
+    out = open(output, "a", encoding="utf-8") if output else sys.stdout
+    docs = pages = errors = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalogue_path,)) as pool:
+            pending = set()
+            while True:
+                # about two documents per worker in flight; the rest stay unread in the input
+                for s in itertools.islice(sources, 2 * workers - len(pending)):
+                    pending.add(pool.submit(process, *s, dpi=dpi, max_pages=max_pages, cutoff=cutoff))
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    record = fut.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    docs += 1
+                    pages += record.get("pages", 0)
+                    errors += "error" in record
+                    if log and docs % 50 == 0:
+                        elapsed = time.perf_counter() - start
+                        print(f"{docs} docs  {docs / elapsed:.2f} docs/s  {pages / elapsed:.2f} pages/s", file=log)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    stats = {
+        "docs": docs, "pages": pages, "errors": errors, "skipped": len(done), "seconds": round(elapsed, 3),
+        "docs_per_sec": round(docs / elapsed, 3) if elapsed else 0.0,
+        "pages_per_sec": round(pages / elapsed, 3) if elapsed else 0.0,
+    }
+    if log:
+        print(json.dumps(stats), file=log)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m genericbro.batch", description=__doc__.split("\n\n")[0])
+    ap.add_argument("input", help="directory, .zip/.tar archive or single PDF/PNG/JPEG")
+    ap.add_argument("-o", "--output", help="JSON-lines file to append to (enables resume); default stdout")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    ap.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES)
+    ap.add_argument("--cutoff", type=float, default=0.85, help="fuzzy match cutoff (0-1)")
+    ap.add_argument("--catalogue", default=CATALOGUE_PATH)
+    args = ap.parse_args(argv)
+    stats = run(args.input, args.output, args.workers, args.dpi, args.max_pages, args.cutoff, args.catalogue)
+    return 1 if stats["errors"] and stats["errors"] == stats["docs"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
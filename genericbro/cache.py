@@ -0,0 +1,267 @@
+"""Result cache shared across sessions, worker processes and restarts.
+
+A :class:`TieredCache` checks an in-process LRU first, then a shared store
+(SQLite file by default, or a local Redis), and back-fills the faster tiers on
+a hit. Pick the shared store with ``GENERICBRO_CACHE``:
+
+    sqlite:///.cache/results.db   (default; every process on the host shares it)
+    redis://localhost:6379/0      (needs the ``redis`` package)
+    memory://                     (per-process only)
+
+Every tier implements ``get(key) -> (found, value)``, ``set(key, value, ttl)``
+and ``clear()``; values are pickled for the shared tiers. Unpickling runs code,
+so the shared store must be as trusted as the app itself: use a cache file only
+this app can write and a Redis instance no other tenant can reach.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_ENV = "GENERICBRO_CACHE"
+DEFAULT_URL = "sqlite:///.cache/results.db"
+MISSING = (False, None)
+
+
+def make_key(namespace, *parts) -> str:
+    """Stable key for ``parts`` (anything with a deterministic ``repr``) under ``namespace``."""
+    return f"{namespace}:" + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+class MemoryTier:
+    name = "memory"
+
+    def __init__(self, max_items=2048):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return MISSING
+            value, expires = item
+            if expires is not None and expires < time.time():
+                del self._items[key]
+                return MISSING
+            self._items.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._items[key] = (value, None if ttl is None else time.time() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class SqliteTier:
+    """Pickled values in one SQLite table; least recently read rows go first past ``max_bytes``.
+
+    Triggers keep the table's total size in ``cache_size``, so a write checks the
+    budget without scanning, and every process sharing the file sees the same
+    total. Reads only record their time when the stored one is older than
+    ``touch_seconds``, so hot keys do not take the write lock on every hit.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, touch_seconds=60, sweep_seconds=60):
+        self.path, self.max_bytes = Path(path), max_bytes
+        self.touch_seconds, self.sweep_seconds = touch_seconds, sweep_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._swept = 0.0
+        self.evictions = 0
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")  # one process creates the schema and seeds the total
+        try:
+            db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, size INTEGER,"
+                       " expires REAL, accessed REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+            db.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+            db.execute("CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER)")
+            db.execute("INSERT OR IGNORE INTO cache_size SELECT 0, COALESCE(SUM(size), 0) FROM cache")
+            for name, event, delta in (("insert", "INSERT", "new.size"), ("delete", "DELETE", "-old.size"),
+                                       ("update", "UPDATE OF size", "new.size - old.size")):
+                db.execute(f"CREATE TRIGGER IF NOT EXISTS cache_size_{name} AFTER {event} ON cache"
+                           f" BEGIN UPDATE cache_size SET total = total + {delta}; END")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _conn(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def get(self, key):
+        db, now = self._conn(), time.time()
+        row = db.execute("SELECT value, expires, accessed FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return MISSING
+        if row[1] is not None and row[1] < now:
+            db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return MISSING
+        if now - row[2] >= self.touch_seconds:
+            db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return True, pickle.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        blob, now = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time()
+        if len(blob) > self.max_bytes:
+            return
+        db = self._conn()
+        # an upsert, not INSERT OR REPLACE: REPLACE's implicit delete does not fire the size trigger
+        db.execute("INSERT INTO cache VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value,"
+                   " size = excluded.size, expires = excluded.expires, accessed = excluded.accessed",
+                   (key, blob, len(blob), None if ttl is None else now + ttl, now))
+        self._evict(db, now)
+
+    def size(self) -> int:
+        """Total bytes of the stored values."""
+        return self._conn().execute("SELECT total FROM cache_size").fetchone()[0]
+
+    def _evict(self, db, now):
+        if now - self._swept >= self.sweep_seconds:
+            self._swept = now
+            db.execute("DELETE FROM cache WHERE expires < ?", (now,))
+        total = db.execute("SELECT total FROM cache_size").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least recently read rows down to 90% so evictions come in batches
+        excess, dropped = total - int(self.max_bytes * 0.9), 0
+        for key, size in db.execute("SELECT key, size FROM cache ORDER BY accessed").fetchall():
+            if excess <= 0:
+                break
+            db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            excess -= size
+            dropped += 1
+        self.evictions += dropped
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
+
+
+class RedisTier:
+    """Pickled values in Redis; the server must be trusted, since every read unpickles what it holds."""
+
+    name = "redis"
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.evictions = 0  # the server evicts on its own (maxmemory-policy)
+
+    def get(self, key):
+        blob = self._client.get(key)
+        return MISSING if blob is None else (True, pickle.loads(blob))
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                         ex=None if ttl is None else max(1, int(ttl)))
+
+    def clear(self):
+        self._client.flushdb()
+
+
+class TieredCache:
+    def __init__(self, tiers):
+        self.tiers = list(tiers)
+        self.hits = {t.name: 0 for t in self.tiers}
+        self.misses = self.errors = 0
+        self._lock = threading.Lock()
+
+    def _try(self, op, *args):
+        # a shared store that is locked, full or unreachable only costs a miss
+        try:
+            return op(*args)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return MISSING
+
+    def get(self, key):
+        for i, tier in enumerate(self.tiers):
+            found, value = self._try(tier.get, key)
+            if found:
+                for faster in self.tiers[:i]:
+                    self._try(faster.set, key, value)
+                with self._lock:
+                    self.hits[tier.name] += 1
+                return True, value
+        with self._lock:
+            self.misses += 1
+        return MISSING
+
+    def set(self, key, value, ttl=None):
+        for tier in self.tiers:
+            self._try(tier.set, key, value, ttl)
+
+    def get_or_set(self, key, compute, ttl=None):
+        """Cached value for ``key``, computing and storing it with ``compute()`` on a miss."""
+        found, value = self.get(key)
+        if not found:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> dict:
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            "tiers": [t.name for t in self.tiers], "hits": dict(self.hits), "misses": self.misses,
+            "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else None,
+            "evictions": {t.name: t.evictions for t in self.tiers}, "errors": self.errors,
+        }
+
+
+def from_url(url, memory_items=2048) -> TieredCache:
+    """An LRU tier in front of the shared store named by ``url``."""
+    tiers = [MemoryTier(memory_items)]
+    if url.startswith("sqlite:///"):
+        tiers.append(SqliteTier(url[len("sqlite:///"):]))
+    elif url.startswith(("redis://", "rediss://", "unix://")):
+        tiers.append(RedisTier(url))
+    elif url != "memory://":
+        raise ValueError(f"unsupported cache URL {url!r}")
+    return TieredCache(tiers)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> TieredCache:
+    """The process-wide cache configured by ``GENERICBRO_CACHE``, created on first use.
+
+    A shared store that cannot be opened (read-only disk, Redis down) degrades to
+    the in-memory tier alone rather than failing the caller.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            try:
+                _shared = from_url(os.environ.get(CACHE_ENV, DEFAULT_URL))
+            except (OSError, sqlite3.Error, ImportError):
+                _shared = from_url("memory://")
+    return _shared
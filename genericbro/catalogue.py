@@ -0,0 +1,46 @@
+"""The medicine price catalogue (``Final.csv``), parsed once into compact dtypes."""
+import numpy as np
+import pandas as pd
+
+from genericbro.dosage import parse_dosages
+
+CATALOGUE_PATH = "Final.csv"
+
+COL_NAME, COL_FORMULATION, COL_DOSAGE = "Name", "Formulation", "Dosage"
+COL_TYPE, COL_PRICE_GENERIC = "Type", "Cost of generic"
+COL_PRICE_BRAND, COL_SAVE_PCT = "Cost of branded", "Savings"
+COL_USES, COL_SIDE_EFF = "Uses", "Side effects"
+COL_COST_DIFF = "Cost difference"
+
+RENAME = {"uses": COL_USES, "indications": COL_USES, "side effects": COL_SIDE_EFF, "adverse effects": COL_SIDE_EFF}
+PRICE_COLS = (COL_PRICE_GENERIC, COL_PRICE_BRAND, COL_COST_DIFF, COL_SAVE_PCT)
+CATEGORY_COLS = (COL_TYPE, COL_FORMULATION, COL_DOSAGE)
+
+
+def _clean(s: pd.Series) -> pd.Series:
+    return s.astype("string").str.strip().str.lower().astype("category")
+
+
+def tidy_catalogue(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize a raw catalogue frame: headers, helper ``_*_clean`` columns, parsed strengths and dtypes."""
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns={c: RENAME[c.lower()] for c in df if c.lower() in RENAME})
+    df = df[df[COL_NAME].astype(str).str.lower() != "name"]  # repeated header rows
+    df = df.drop(columns=[c for c in df.columns if c.startswith("Unnamed")]).reset_index(drop=True)
+
+    for col in PRICE_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float32)
+    if COL_SAVE_PCT not in df.columns and {COL_PRICE_GENERIC, COL_PRICE_BRAND}.issubset(df.columns):
+        df[COL_SAVE_PCT] = (100 * (df[COL_PRICE_BRAND] - df[COL_PRICE_GENERIC]) / df[COL_PRICE_BRAND]).astype(np.float32)
+
+    df["_form_clean"] = _clean(df[COL_FORMULATION])
+    df[["_strength", "_unit", "_per_ml", "_dosage_clean"]] = parse_dosages(df[COL_DOSAGE])
+    df["_type_clean"] = _clean(df[COL_TYPE])
+    for col in CATEGORY_COLS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def read_catalogue(path=CATALOGUE_PATH) -> pd.DataFrame:
+    return tidy_catalogue(pd.read_csv(path))
@@ -0,0 +1,155 @@
+"""Streamlit-free facade over every in-memory index, for services and scripts.
+
+One ``Core`` per process loads both snapshots and builds the catalogue query
+engine, prescription matcher, name suggestions, savings aggregates, formulation groups, store grid and place index.
+Both tables hot-reload (see :mod:`genericbro.refresh`) and each
+method works on the generation current when it was called. All methods return
+plain JSON-ready dicts and lists.
+"""
+import numpy as np
+import pandas as pd
+
+from genericbro.catalogue import (
+    CATALOGUE_PATH, COL_DOSAGE, COL_FORMULATION, COL_NAME, COL_PRICE_BRAND,
+    COL_PRICE_GENERIC, COL_SAVE_PCT, COL_SIDE_EFF, COL_TYPE, COL_USES,
+)
+from genericbro.geo import cached_query
+from genericbro.prescription import clean_lines, match_positions, summarize
+from genericbro.query import page_slice
+from genericbro.refresh import CATALOGUE, STORES, DataSource
+from genericbro.stores import STORES_PATH
+from genericbro.suggest import SUGGESTIONS
+
+SORTS = {"generic": COL_PRICE_GENERIC, "branded": COL_PRICE_BRAND, "savings": COL_SAVE_PCT}
+MEDICINE_FIELDS = {
+    "name": COL_NAME, "formulation": COL_FORMULATION, "dosage": COL_DOSAGE, "type": COL_TYPE,
+    "generic_price": COL_PRICE_GENERIC, "branded_price": COL_PRICE_BRAND, "savings_pct": COL_SAVE_PCT,
+}
+DETAIL_FIELDS = {**MEDICINE_FIELDS, "uses": COL_USES, "side_effects": COL_SIDE_EFF}
+SAVINGS_FIELDS = {
+    "Type": "type", "Formulation": "formulation", "Products": "products", "Formulations": "formulations",
+    "Median savings %": "median_savings_pct", "Max savings %": "max_savings_pct",
+    "Cheapest generic": "cheapest_generic", "Dosage": "dosage", "Generic ₹": "generic_price",
+}
+STORE_FIELDS = {"code": "kendra code", "name": "name", "address": "address", "pin": "pin",
+                "district": "district name", "state": "state name", "contact": "contact", "lat": "lat", "lon": "lon"}
+
+
+def records(df: pd.DataFrame, positions, fields, **extra) -> list:
+    """Rows at ``positions`` as compact dicts; NaN becomes ``None``, floats are rounded."""
+    cols = {k: c for k, c in fields.items() if c in df.columns}
+    frame = df.iloc[np.asarray(positions, dtype=np.intp)][list(cols.values())]
+    frame.columns = list(cols)
+    for k in frame.columns:
+        if pd.api.types.is_float_dtype(frame[k]):
+            frame[k] = frame[k].astype(np.float64).round(6 if k in ("lat", "lon") else 2)
+    for k, values in extra.items():
+        frame[k] = values
+    rows = frame.astype(object).where(frame.notna(), None).to_dict("records")
+    for pos, row in zip(positions, rows):
+        row["id"] = int(pos)
+    return rows
+
+
+def _table(frame: pd.DataFrame) -> list:
+    frame = frame.rename(columns=SAVINGS_FIELDS).round(2)
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+class Core:
+    def __init__(self, catalogue_path=CATALOGUE_PATH, stores_path=STORES_PATH, poll_seconds=None):
+        self.catalogue_source = DataSource(catalogue_path, CATALOGUE, poll_seconds=poll_seconds)
+        self.stores_source = DataSource(stores_path, STORES, poll_seconds=poll_seconds)
+        for name in ("query", "matcher", "fulltext", "suggest", "analytics"):
+            self.catalogue_source.current.index(name)
+        for name in ("grid", "places"):
+            self.stores_source.current.index(name)
+
+    @property
+    def catalogue(self) -> pd.DataFrame:
+        return self.catalogue_source.current.df
+
+    @property
+    def stores(self) -> pd.DataFrame:
+        return self.stores_source.current.df
+
+    def versions(self) -> dict:
+        return {"catalogue": self.catalogue_source.current.version, "stores": self.stores_source.current.version}
+
+    # ── catalogue
+    def search(self, typ=None, dosage=None, name=None, formulation=None, sort="generic", ascending=True,
+               strength=None, same_strength=False, page=1, page_size=20) -> dict:
+        cat = self.catalogue_source.current
+        result = cat.index("query").search(typ, dosage, name, formulation, SORTS[sort], ascending, strength, same_strength)
+        _, _, rows = page_slice(result.hits, page, page_size)
+        out = {"total": len(result.hits), "page": page, "page_size": page_size,
+               "results": records(cat.df, rows, MEDICINE_FIELDS)}
+        if name is not None:
+            out["same_formulation"] = records(cat.df, result.same[:page_size], MEDICINE_FIELDS)
+        return out
+
+    def text_search(self, q, typ=None, page=1, page_size=20) -> dict:
+        cat = self.catalogue_source.current
+        hits = cat.index("fulltext").search(q, typ, limit=page_size, offset=(page - 1) * page_size)
+        return {"total": hits.total, "page": page, "page_size": page_size,
+                "results": records(cat.df, hits.positions, MEDICINE_FIELDS)}
+
+    def suggest(self, q, kind="name", typ=None, limit=SUGGESTIONS) -> dict:
+        total, labels = self.catalogue_source.current.index("suggest").complete(kind, q, typ, limit)
+        return {"total": total, "suggestions": list(labels)}
+
+    def search_frame(self, typ=None, dosage=None, name=None, formulation=None, sort="generic", ascending=True,
+                     strength=None, same_strength=False):
+        """Every hit of :meth:`search` as a DataFrame with the public field names, for exports."""
+        cat = self.catalogue_source.current
+        query = cat.index("query")
+        hits = query.search(typ, dosage, name, formulation, SORTS[sort], ascending, strength, same_strength).hits
+        frame = cat.df.iloc[hits][list(MEDICINE_FIELDS.values())]
+        frame.columns = list(MEDICINE_FIELDS)
+        return frame
+
+    def savings(self, typ=None, formulation=None, limit=100) -> dict:
+        """Savings by type; with ``typ``, by formulation within it; with both, that formulation's products."""
+        cat = self.catalogue_source.current
+        summary = cat.index("analytics")
+        if typ is None:
+            return {**summary.overall, "types": _table(summary.types)}
+        if formulation is None:
+            forms = summary.formulations(typ)
+            return {"type": typ, "total": len(forms), "formulations": _table(forms.reset_index(names="key"))}
+        rows = summary.products(typ, formulation)
+        return {"type": typ, "formulation": formulation, "total": len(rows),
+                "results": records(cat.df, rows[:limit], MEDICINE_FIELDS)}
+
+    def medicine(self, row) -> dict:
+        return records(self.catalogue, [row], DETAIL_FIELDS)[0]
+
+    def alternatives(self, row, limit=20) -> dict:
+        cat = self.catalogue_source.current
+        alts = cat.index("groups").alternatives(row)
+        return {"id": int(row), "total": len(alts), "alternatives": records(cat.df, alts[:limit], MEDICINE_FIELDS)}
+
+    def match_text(self, text, cutoff=0.85) -> dict:
+        cat = self.catalogue_source.current
+        return summarize(match_positions(clean_lines(text), cat.index("matcher"), cutoff), cat.df, cat.index("groups"))
+
+    # ── stores
+    def nearby(self, lat, lon, radius_km=None, k=None, limit=100) -> dict:
+        db = self.stores_source.current
+        if radius_km is not None:
+            pos, dist = cached_query(db.index("grid"), db.layout, "radius", lat, lon, radius_km)
+        else:
+            pos, dist = cached_query(db.index("grid"), db.layout, "nearest", lat, lon, k or 10)
+        return {"total": len(pos),
+                "results": records(db.df, pos[:limit], STORE_FIELDS, distance_km=np.round(dist[:limit], 3))}
+
+    def stores_by(self, pin=None, city=None, area=None, limit=100) -> dict:
+        db = self.stores_source.current
+        places = db.index("places")
+        if pin:
+            pos = places.pin(pin)
+        elif city:
+            pos = places.city(city)
+        else:
+            pos = places.locality(area or "")
+        return {"total": len(pos), "results": records(db.df, pos[:limit], STORE_FIELDS)}
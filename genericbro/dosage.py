@@ -0,0 +1,123 @@
+"""Free-text dosages ("1 mg", "3mg", "500 MG/5ML", "25 mcg") parsed into numbers.
+
+:func:`parse_dosages` works on a whole column and returns four columns per row:
+
+- the strength, with mass normalized to mg
+- the unit ("mg", "IU", "%" or "" for a bare number)
+- the per-volume denominator in ml
+- a canonical label ("500 mg/5 ml")
+
+Text that is not a strength, such as "Calamine lotion", keeps its cleaned text
+as the label and has no strength. :class:`StrengthIndex` sorts rows by unit and
+by strength per ml, so range and same-strength filters are binary searches::
+
+    rows = StrengthIndex(df).range(100, 500, "mg")
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# written unit -> (normalized unit, factor to it, canonical spelling)
+UNITS = {
+    "mg": ("mg", 1.0, "mg"), "mcg": ("mg", 1e-3, "mcg"), "µg": ("mg", 1e-3, "mcg"), "ug": ("mg", 1e-3, "mcg"),
+    "g": ("mg", 1e3, "g"), "gm": ("mg", 1e3, "g"), "iu": ("IU", 1.0, "IU"), "%": ("%", 1.0, "%"),
+}
+VOLUMES = {"ml": 1.0, "l": 1e3}
+_STRENGTH = re.compile(
+    r"^\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>mg|mcg|µg|ug|gm|g|iu|%)?(?:\s*w/v)?"
+    r"\s*(?:(?:/|per)\s*(?P<per>\d+(?:\.\d+)?)?\s*(?P<vol>ml|l))?\s*$",
+    re.IGNORECASE,
+)
+_SPACE = re.compile(r"\s+")
+# relative tolerance for "same strength": 25 mcg and 0.025 mg differ only by float rounding
+_EPS = 1e-9
+
+
+def _num(v) -> str:
+    return np.format_float_positional(v, trim="-")
+
+
+def _parse_one(text) -> tuple:
+    """``(strength, unit, per ml, label)`` of one dosage string."""
+    m = _STRENGTH.match(text)
+    if m is None:
+        return np.nan, "", np.nan, _SPACE.sub(" ", text.strip().lower())
+    unit, factor, spelling = UNITS.get((m["unit"] or "").lower(), ("", 1.0, ""))
+    label = _num(float(m["value"])) + ("" if spelling in ("", "%") else " ") + spelling
+    per = np.nan
+    if m["vol"]:
+        per = float(m["per"] or 1.0) * VOLUMES[m["vol"].lower()]
+        label += "/" + (f"{_num(float(m['per']))} " if m["per"] else "") + m["vol"].lower()
+    return float(m["value"]) * factor, unit, per, label
+
+
+def parse_dosages(dosage: pd.Series) -> pd.DataFrame:
+    """``_strength``, ``_unit``, ``_per_ml`` and ``_dosage_clean`` for every row of ``dosage``.
+
+    Only distinct spellings are parsed; rows pick their result up by code.
+    """
+    codes, uniques = pd.factorize(dosage.astype(object))
+    parsed = [_parse_one(str(u)) for u in uniques] + [(np.nan, "", np.nan, None)]  # last row: missing dosage
+    out = pd.DataFrame(parsed, columns=["_strength", "_unit", "_per_ml", "_dosage_clean"])
+    out = out.iloc[np.where(codes < 0, len(uniques), codes)]
+    out.index = dosage.index
+    return out.astype({"_strength": np.float64, "_unit": "category", "_per_ml": np.float32,
+                       "_dosage_clean": "category"})
+
+
+def dosage_label(text):
+    """Canonical label of one dosage string (idempotent: labels map to themselves)."""
+    if text is None:
+        return None
+    return _parse_one(str(text))[3]
+
+
+def strength_keys(df: pd.DataFrame) -> tuple:
+    """Per row ``(unit key, strength per dose or per ml)``; concentrations get a "/ml" unit key."""
+    per = df["_per_ml"].to_numpy(dtype=np.float64)
+    has_per = ~np.isnan(per)
+    unit = df["_unit"].astype(str).to_numpy(dtype=object) + np.where(has_per, "/ml", "")
+    return unit, df["_strength"].to_numpy(dtype=np.float64) / np.where(has_per, per, 1.0)
+
+
+def label_order(df: pd.DataFrame) -> dict:
+    """Canonical label → sort rank: numeric strengths by unit then value, free text after them."""
+    unit, value = strength_keys(df)
+    frame = pd.DataFrame({"label": df["_dosage_clean"].astype(object), "unit": unit, "value": value}).dropna(subset=["label"])
+    frame = frame.drop_duplicates("label").assign(text=lambda f: f["value"].isna())
+    frame = frame.sort_values(["text", "unit", "value", "label"], kind="stable")
+    return {label: i for i, label in enumerate(frame["label"])}
+
+
+class StrengthIndex:
+    """Rows grouped by unit key and sorted by strength within each."""
+
+    def __init__(self, df: pd.DataFrame):
+        self._unit, self._value = strength_keys(df)
+        self._segments = {}
+        known = ~np.isnan(self._value)
+        for u in np.unique(self._unit[known]):
+            pos = np.flatnonzero(known & (self._unit == u))
+            order = np.argsort(self._value[pos], kind="stable")
+            self._segments[u] = (self._value[pos][order], pos[order])
+        # the most common unit first: it is the sensible default for a picker; bare numbers have no unit to pick
+        self.units = sorted((u for u in self._segments if u), key=lambda u: (-len(self._segments[u][1]), u))
+
+    def bounds(self, unit) -> tuple:
+        values, _ = self._segments.get(unit, (np.empty(0), None))
+        return (float(values[0]), float(values[-1])) if len(values) else (0.0, 0.0)
+
+    def range(self, lo=None, hi=None, unit="mg") -> np.ndarray:
+        """Sorted row positions with ``lo <= strength <= hi`` in ``unit`` (either bound may be ``None``)."""
+        values, pos = self._segments.get(unit, (np.empty(0), np.empty(0, dtype=np.intp)))
+        i = 0 if lo is None else np.searchsorted(values, lo - abs(lo) * _EPS, "left")
+        j = len(values) if hi is None else np.searchsorted(values, hi + abs(hi) * _EPS, "right")
+        return np.sort(pos[i:j])
+
+    def same(self, row) -> np.ndarray:
+        """Sorted row positions with exactly the strength of ``row`` (empty if it has none)."""
+        value = self._value[row]
+        if np.isnan(value):
+            return np.empty(0, dtype=np.intp)
+        return self.range(value, value, self._unit[row])
@@ -0,0 +1,60 @@
+"""Same-formulation groups over the catalogue, built once at load time."""
+import re
+
+import numpy as np
+import pandas as pd
+
+from genericbro.catalogue import COL_FORMULATION, COL_PRICE_GENERIC
+
+_UNIT_GAP = re.compile(r"(\d)\s+(mg|mcg|g|ml|iu|%)\b")
+_SPLIT = re.compile(r"\s*[+,]\s*")
+
+
+def formulation_key(text) -> str:
+    """Order-insensitive key, e.g. "Glimepiride 1 mg" and "glimepiride 1mg" collapse."""
+    if not isinstance(text, str):
+        return ""
+    t = re.sub(r"[()]", " ", text.lower())
+    t = _UNIT_GAP.sub(r"\1\2", re.sub(r"\s+", " ", t))
+    return " + ".join(sorted({p.strip() for p in _SPLIT.split(t) if p.strip()}))
+
+
+class FormulationGroups:
+    """Formulation key → row positions, each group ranked cheapest generic first."""
+
+    def __init__(self, df: pd.DataFrame):
+        forms = df[COL_FORMULATION].astype("category")
+        # normalize each distinct formulation once, then broadcast through the codes
+        cat_keys = np.array([formulation_key(c) for c in forms.cat.categories] + [""], dtype=object)
+        keys = cat_keys[forms.cat.codes.to_numpy()]
+        price = pd.to_numeric(df[COL_PRICE_GENERIC], errors="coerce").to_numpy(dtype=np.float64)
+
+        order = np.lexsort((np.nan_to_num(price, nan=np.inf), keys))
+        self.keys = keys
+        self.groups = {}
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        for chunk in np.split(order, bounds):
+            if len(chunk) and keys[chunk[0]]:
+                self.groups[keys[chunk[0]]] = chunk
+
+    def __len__(self):
+        return len(self.groups)
+
+    def group(self, key):
+        return self.groups.get(key, np.empty(0, dtype=np.intp))
+
+    def members(self, positions):
+        """Every row sharing a formulation with any of ``positions``, cheapest first per group."""
+        seen = dict.fromkeys(self.keys[np.asarray(positions, dtype=np.intp)])
+        chunks = [self.group(k) for k in seen if k]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.intp)
+
+    def alternatives(self, pos):
+        """Other rows with the same formulation as ``pos``, cheapest generic first."""
+        grp = self.group(self.keys[pos])
+        return grp[grp != pos]
+
+    def cheapest(self, pos):
+        grp = self.group(self.keys[pos])
+        return int(grp[0]) if len(grp) else None
@@ -0,0 +1,162 @@
+"""Downloadable exports of result tables, built only when a download is requested.
+
+Every format renders from a plain DataFrame in fixed-size row chunks; finished
+files are kept in a small process-wide cache keyed by the hash of the exported
+rows, so re-downloading the same result set costs nothing::
+
+    data = export(rows, "pdf")          # bytes, or None if the format's library is missing
+    for chunk in iter_csv(rows): ...    # streaming CSV for HTTP responses
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+CHUNK_ROWS = 2000
+PDF_ROWS_PER_PAGE = 40
+CACHE_BYTES = 64 * 1024 * 1024
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "pdf": ("application/pdf", "pdf"),
+}
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Content hash of a result set: its column names and values, ignoring the index."""
+    h = hashlib.sha1("\x1f".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _chunks(df, size=CHUNK_ROWS):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def iter_csv(df: pd.DataFrame, chunk_rows=CHUNK_ROWS):
+    """UTF-8 CSV as byte chunks: the header, then ``chunk_rows`` rows at a time."""
+    yield df.head(0).to_csv(index=False).encode()
+    for chunk in _chunks(df, chunk_rows):
+        yield chunk.to_csv(index=False, header=False).encode()
+
+
+def csv_bytes(df):
+    return b"".join(iter_csv(df))
+
+
+def xlsx_bytes(df):
+    try:
+        import xlsxwriter
+    except ImportError:
+        return None
+    buf = io.BytesIO()
+    book = xlsxwriter.Workbook(buf, {"constant_memory": True, "in_memory": True, "nan_inf_to_errors": True})
+    sheet = book.add_worksheet("Results")
+    sheet.write_row(0, 0, [str(c) for c in df.columns], book.add_format({"bold": True}))
+    r = 1
+    for chunk in _chunks(df):
+        for values in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False):
+            sheet.write_row(r, 0, values)
+            r += 1
+    book.close()
+    return buf.getvalue()
+
+
+def _cell(v):
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    return f"{v:.2f}" if isinstance(v, float) else str(v)
+
+
+def pdf_bytes(df, rows_per_page=PDF_ROWS_PER_PAGE):
+    try:
+        from reportlab.platypus import PageBreak, SimpleDocTemplate, Table, TableStyle
+        from reportlab.lib.pagesizes import landscape, letter
+        from reportlab.lib import colors
+    except ImportError:
+        return None
+    style = TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
+        ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
+        ("FONTSIZE", (0,0), (-1,-1), 8),
+        ("ALIGN", (0,0), (-1,-1), "LEFT")
+    ])
+    header = [str(c) for c in df.columns]
+    # one small table per page: reportlab splits a single huge table in quadratic time
+    story = []
+    for chunk in _chunks(df, rows_per_page):
+        if story:
+            story.append(PageBreak())
+        body = [[_cell(v) for v in row] for row in chunk.astype(object).itertuples(index=False)]
+        story.append(Table([header] + body, style=style))
+    if not story:
+        story.append(Table([header], style=style))
+    buf = io.BytesIO()
+    SimpleDocTemplate(buf, pagesize=landscape(letter)).build(story)
+    return buf.getvalue()
+
+
+RENDERERS = {"csv": csv_bytes, "xlsx": xlsx_bytes, "pdf": pdf_bytes}
+REQUIRES = {"xlsx": "xlsxwriter", "pdf": "reportlab"}
+
+
+class ExportCache:
+    """Rendered files by ``(digest, format)``, least recently used evicted past ``max_bytes``."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes, self.size = max_bytes, 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, df, fmt):
+        key = (frame_digest(df), fmt)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        data = RENDERERS[fmt](df)
+        if data is not None and len(data) <= self.max_bytes:
+            with self._lock:
+                if key not in self._items:
+                    self._items[key] = data
+                    self.size += len(data)
+                while self.size > self.max_bytes:
+                    _, old = self._items.popitem(last=False)
+                    self.size -= len(old)
+        return data
+
+
+_cache = ExportCache()
+
+
+def export(df, fmt):
+    """``df`` rendered as ``fmt`` ("csv", "xlsx" or "pdf"), cached by content."""
+    return _cache.render(df, fmt)
+
+
+def available(fmt) -> bool:
+    """Whether the optional library behind ``fmt`` is installed."""
+    from importlib.util import find_spec
+
+    module = REQUIRES.get(fmt)
+    return module is None or find_spec(module) is not None
+
+
+def download_buttons(df, stem, key, formats=("csv", "xlsx", "pdf")):
+    """One Streamlit download button per format; each file is rendered only when clicked.
+
+    ``df`` may be a zero-argument callable returning the frame, so a large result
+    set is only selected and copied when someone actually downloads it.
+    """
+    import streamlit as st
+
+    frame = df if callable(df) else lambda: df
+    formats = [f for f in formats if available(f)]
+    for col, fmt in zip(st.columns(len(formats)), formats):
+        mime, ext = FORMATS[fmt]
+        col.download_button(f"Download {fmt.upper()}", lambda fmt=fmt: export(frame(), fmt), f"{stem}.{ext}", mime,
+                            key=f"{key}_{fmt}", on_click="ignore")
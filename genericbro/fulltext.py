@@ -0,0 +1,93 @@
+"""Free-text medicine search: an in-memory SQLite FTS5 index ranked by BM25.
+
+Name, formulation, uses and side effects are indexed with per-column weights, so
+"amlo" finds amlodipine brands first and "blood pressure" finds them by use.
+Every query word is matched as a prefix; all words must match, falling back to
+any word when that finds nothing. Every hit is ranked: the weights are FTS5's
+configured ``rank``, so ``ORDER BY rank`` scores the whole match set inside
+SQLite before the page is cut::
+
+    index = FullTextIndex(df)
+    total, positions = index.search("blood press", limit=10)
+"""
+import re
+import sqlite3
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+from genericbro.catalogue import COL_FORMULATION, COL_NAME, COL_SIDE_EFF, COL_TYPE, COL_USES
+from genericbro.match import FORM_PREFIXES
+
+# bm25() weights in column order: name, formulation, uses, side effects
+WEIGHTS = (10.0, 6.0, 2.0, 1.0)
+MAX_TERMS = 8
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class TextHits(NamedTuple):
+    total: int
+    positions: list
+
+
+def query_terms(text) -> list:
+    """Lower-cased words of ``text`` (dosage-form prefixes like "tab" dropped when other words remain)."""
+    words = [w for w in _WORD.findall(str(text).lower()) if len(w) > 1 or w.isdigit()]
+    content = [w for w in words if w not in FORM_PREFIXES]
+    return (content or words)[:MAX_TERMS]
+
+
+def _match_expr(terms, op):
+    return f" {op} ".join(f'"{t}"*' for t in terms)
+
+
+class FullTextIndex:
+    def __init__(self, df):
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute(
+            "CREATE VIRTUAL TABLE docs USING fts5(name, formulation, uses, side_effects, type UNINDEXED,"
+            " prefix='2 3 4', tokenize='unicode61 remove_diacritics 2')"
+        )
+        cols = [df[c].astype(object).where(df[c].notna(), "") for c in (COL_NAME, COL_FORMULATION, COL_USES, COL_SIDE_EFF, COL_TYPE)]
+        self._db.executemany(
+            "INSERT INTO docs (rowid, name, formulation, uses, side_effects, type) VALUES (?, ?, ?, ?, ?, ?)",
+            ((i, *map(str, row)) for i, row in enumerate(zip(*cols))),
+        )
+        self._db.execute("INSERT INTO docs (docs) VALUES ('optimize')")
+        self._db.execute("INSERT INTO docs (docs, rank) VALUES ('rank', ?)", ["bm25({})".format(", ".join(map(str, WEIGHTS)))])
+
+    def _query(self, expr, typ, limit, offset):
+        where, args = "docs MATCH ?", [expr]
+        if typ is not None:
+            where += " AND type = ?"
+            args.append(typ)
+        with self._lock:
+            total = self._db.execute(f"SELECT count(*) FROM docs WHERE {where}", args).fetchone()[0]
+            if not total:
+                return TextHits(0, [])
+            rows = self._db.execute(
+                f"SELECT rowid FROM docs WHERE {where} ORDER BY rank, rowid LIMIT ? OFFSET ?",
+                args + [-1 if limit is None else limit, offset],
+            ).fetchall()
+        return TextHits(total, [r[0] for r in rows])
+
+    def search(self, text, typ=None, limit=20, offset=0, allowed=None) -> TextHits:
+        """Best-first catalogue row positions for ``text``; ``limit=None`` returns every hit.
+
+        ``allowed`` (row positions, e.g. a dosage filter) narrows the hits before they are counted and paged.
+        """
+        terms = query_terms(text)
+        if not terms:
+            return TextHits(0, [])
+        page = (limit, offset) if allowed is None else (None, 0)
+        hits = self._query(_match_expr(terms, "AND"), typ, *page)
+        if not hits.total and len(terms) > 1:
+            hits = self._query(_match_expr(terms, "OR"), typ, *page)
+        if allowed is None:
+            return hits
+        ranked = np.asarray(hits.positions, dtype=np.intp)
+        ranked = ranked[np.isin(ranked, allowed)]
+        return TextHits(len(ranked), ranked[offset:None if limit is None else offset + limit].tolist())
@@ -0,0 +1,102 @@
+"""Spatial search over Jan Aushadhi store coordinates."""
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance from one point to arrays of points, in km."""
+    φ1, φ2 = np.radians(lat), np.radians(lats)
+    dφ, dλ = φ2 - φ1, np.radians(np.asarray(lons) - lon)
+    a = np.sin(dφ / 2) ** 2 + np.cos(φ1) * np.cos(φ2) * np.sin(dλ / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class StoreIndex:
+    """Lat/lon grid over store coordinates, built once per dataset.
+
+    Queries return *positions* into the frame the index was built from, so the
+    caller selects with ``df.iloc[pos]`` and never has to write into a cached frame.
+    """
+
+    def __init__(self, lat, lon, cell_deg=0.25):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.cell_deg = cell_deg
+        self._cols = int(np.ceil(360 / cell_deg)) + 1
+        codes = self._code(self.lat, self.lon)
+        self._order = np.argsort(codes, kind="stable")
+        self._codes = codes[self._order]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, lat="lat", lon="lon", **kw):
+        return cls(df[lat].to_numpy(), df[lon].to_numpy(), **kw)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _cell(self, lat, lon):
+        return (np.floor((np.asarray(lat) + 90) / self.cell_deg).astype(np.int64),
+                np.floor((np.asarray(lon) + 180) / self.cell_deg).astype(np.int64))
+
+    def _code(self, lat, lon):
+        r, c = self._cell(lat, lon)
+        return r * self._cols + c
+
+    def _candidates(self, lat, lon, radius_km):
+        d = radius_km / EARTH_RADIUS_KM  # angular radius
+        dlat = np.degrees(d)
+        if abs(lat) + dlat >= 90:  # the circle covers a pole, so every longitude
+            return np.arange(len(self))
+        # widest longitude offset of a spherical cap (reached below its top latitude)
+        dlon = np.degrees(np.arcsin(min(1.0, np.sin(d) / np.cos(np.radians(lat)))))
+        if lon - dlon < -180 or lon + dlon > 180:
+            return np.arange(len(self))
+        (r0, r1), (c0, c1) = zip(self._cell(lat - dlat, lon - dlon), self._cell(lat + dlat, lon + dlon))
+        rows = np.arange(r0, r1 + 1) * self._cols
+        lo = np.searchsorted(self._codes, rows + c0, side="left")
+        hi = np.searchsorted(self._codes, rows + c1, side="right")
+        if not (hi > lo).any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._order[a:b] for a, b in zip(lo, hi) if b > a])
+
+    def radius(self, lat, lon, radius_km):
+        """Stores within ``radius_km``, nearest first: ``(positions, distances_km)``."""
+        cand = self._candidates(lat, lon, radius_km)
+        dist = haversine_km(lat, lon, self.lat[cand], self.lon[cand])
+        keep = dist <= radius_km
+        cand, dist = cand[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return cand[order], dist[order]
+
+    def nearest(self, lat, lon, k=10):
+        """The ``k`` closest stores, nearest first: ``(positions, distances_km)``."""
+        dist = haversine_km(lat, lon, self.lat, self.lon)
+        k = min(k, len(dist))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        part = np.argpartition(dist, k - 1)[:k]
+        order = part[np.argsort(dist[part], kind="stable")]
+        return order, dist[order]
+
+    def select(self, df: pd.DataFrame, positions, distances):
+        """Rows of ``df`` at ``positions`` with a fresh ``distance_km`` column."""
+        return df.iloc[positions].assign(distance_km=distances)
+
+
+GEO_TTL = 24 * 3600
+
+
+def cached_query(index: StoreIndex, version, kind, lat, lon, arg, ttl=GEO_TTL):
+    """``index.radius(lat, lon, arg)`` or ``index.nearest(...)`` through the shared result cache.
+
+    ``version`` must identify the store data *and its row order* (see
+    ``refresh.Generation.layout``), since the cached results are positions;
+    coordinates are rounded to ~1 m so repeated GPS fixes share an entry.
+    """
+    from genericbro.cache import make_key, shared_cache
+
+    lat, lon = round(float(lat), 5), round(float(lon), 5)
+    key = make_key("geo", version, kind, lat, lon, arg)
+    return shared_cache().get_or_set(key, lambda: getattr(index, kind)(lat, lon, arg), ttl)
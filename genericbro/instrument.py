@@ -0,0 +1,197 @@
+"""Per-rerun stage timings for the Streamlit pages.
+
+A page opens one :class:`Rerun` at the top and wraps its work in stages::
+
+    run = page_run("finder")
+    with run.stage("search") as s:
+        hits = engine.search(...)
+        s.rows = len(hits)
+    run.finish()
+
+Every finished rerun becomes one JSON line on the ``genericbro.metrics`` logger
+and, when ``GENERICBRO_METRICS`` names a file, is appended to that file too.
+Stages opened with ``cached=True`` report a hit unless a cached builder inside
+them calls :func:`miss`. Adding ``?profile=1`` to a page URL dumps a cProfile of
+that one rerun into ``.profiles/``.
+
+Summarize a metrics file with::
+
+    python -m genericbro.instrument metrics.jsonl
+"""
+import argparse
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+METRICS_ENV = "GENERICBRO_METRICS"
+PROFILE_DIR = ".profiles"
+
+log = logging.getLogger("genericbro.metrics")
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+class Stage:
+    __slots__ = ("name", "seconds", "rows", "cache")
+
+    def __init__(self, name, rows=None, cache=None):
+        self.name, self.seconds, self.rows, self.cache = name, 0.0, rows, cache
+
+    def as_dict(self):
+        out = {"name": self.name, "ms": round(self.seconds * 1e3, 3)}
+        if self.rows is not None:
+            out["rows"] = int(self.rows)
+        if self.cache is not None:
+            out["cache"] = self.cache
+        return out
+
+
+def miss():
+    """Mark the innermost open stage on this thread as a cache miss (no-op outside a stage)."""
+    stage = getattr(_local, "stage", None)
+    if stage is not None:
+        stage.cache = "miss"
+
+
+class Rerun:
+    def __init__(self, page, profile_path=None):
+        self.page, self.stages, self.finished = page, [], False
+        self.created = time.time()
+        self.started = self.ended = time.perf_counter()
+        self.profile_path, self.profiler = profile_path, None
+        if profile_path:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @contextmanager
+    def stage(self, name, rows=None, cached=False):
+        s = Stage(name, rows, "hit" if cached else None)
+        outer, _local.stage = getattr(_local, "stage", None), s
+        start = time.perf_counter()
+        try:
+            yield s
+        finally:
+            self.ended = time.perf_counter()
+            s.seconds = self.ended - start
+            _local.stage = outer
+            self.stages.append(s)
+
+    def timed(self, name, cached=False):
+        """Decorator form of :meth:`stage`; a returned sized object sets the row count."""
+        def wrap(fn):
+            def inner(*args, **kwargs):
+                with self.stage(name, cached=cached) as s:
+                    out = fn(*args, **kwargs)
+                    if hasattr(out, "__len__"):
+                        s.rows = len(out)
+                    return out
+            return inner
+        return wrap
+
+    def finish(self, status="ok"):
+        """Close the rerun and emit its record; later calls return the same record."""
+        if self.finished:
+            return self.record
+        self.finished = True
+        if status == "ok":
+            self.ended = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.disable()
+            Path(self.profile_path).parent.mkdir(parents=True, exist_ok=True)
+            self.profiler.dump_stats(self.profile_path)
+        self.record = {
+            "ts": round(self.created, 3), "page": self.page, "status": status,
+            "total_ms": round((self.ended - self.started) * 1e3, 3),
+            "stages": [s.as_dict() for s in self.stages],
+        }
+        if self.profile_path:
+            self.record["profile"] = str(self.profile_path)
+        emit(self.record)
+        return self.record
+
+
+def emit(record):
+    line = json.dumps(record, ensure_ascii=False)
+    log.info(line)
+    path = os.environ.get(METRICS_ENV)
+    if path:
+        with _write_lock, open(path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+def page_run(page):
+    """Start the instrumented rerun of ``page`` for the current Streamlit session.
+
+    A rerun left open by the previous script run (an exception, or a ``st.stop()``
+    not routed through :meth:`stop`) is emitted first with status ``"aborted"``.
+    """
+    import streamlit as st
+
+    pending = st.session_state.get("_metrics_run")
+    if pending is not None and not pending.finished:
+        pending.finish("aborted")
+    profile_path = None
+    if st.query_params.get("profile") == "1":
+        profile_path = Path(PROFILE_DIR) / f"{page}-{time.strftime('%Y%m%d-%H%M%S')}.pstats"
+        st.caption(f"Profiling this rerun → `{profile_path}`")
+    run = st.session_state["_metrics_run"] = Rerun(page, profile_path)
+    return run
+
+
+def stop(run):
+    """``st.stop()`` that records the rerun first."""
+    import streamlit as st
+
+    run.finish("stopped")
+    st.stop()
+
+
+def summarize(lines):
+    """Per page/stage count, p50/p95 ms and cache hit rate from metrics JSON lines."""
+    times, hits = defaultdict(list), defaultdict(lambda: [0, 0])
+    for line in lines:
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        times[(rec["page"], "(total)")].append(rec["total_ms"])
+        for s in rec["stages"]:
+            key = (rec["page"], s["name"])
+            times[key].append(s["ms"])
+            if "cache" in s:
+                hits[key][s["cache"] == "hit"] += 1
+    rows = []
+    for (page, name), ms in sorted(times.items()):
+        miss_n, hit_n = hits.get((page, name), (0, 0))
+        rows.append({
+            "page": page, "stage": name, "n": len(ms),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3), "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "hit_rate": round(hit_n / (hit_n + miss_n), 3) if hit_n + miss_n else None,
+        })
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m genericbro.instrument", description="Summarize page metrics.")
+    ap.add_argument("metrics", help=f"JSON-lines file written via {METRICS_ENV}")
+    args = ap.parse_args(argv)
+    with open(args.metrics, encoding="utf-8") as fh:
+        rows = summarize(fh)
+    print(f"{'page':12} {'stage':20} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'hit':>6}")
+    for r in rows:
+        hit = "" if r["hit_rate"] is None else f"{r['hit_rate']:.0%}"
+        print(f"{r['page']:12} {r['stage']:20} {r['n']:>6} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {hit:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Paged pharmacy result lists rendered as one HTML element per page.
+
+A page is built with whole-column string operations over at most ``page_size``
+rows, so a 20 km radius or a big city costs the same to show as a handful of
+stores::
+
+    links = nav_links(rows, user_lat, user_lon)
+    html = store_table(rows.iloc[:25], links[:25])
+"""
+import numpy as np
+import pandas as pd
+
+MAPS_DIR = "https://www.google.com/maps/dir/"
+MAPS_PLACE = "https://www.google.com/maps/search/?api=1&query="
+PAGE_SIZES = (10, 25, 50, 100)
+
+_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+STYLE = """<style>
+table.stores{width:100%;border-collapse:collapse;}
+table.stores td{padding:8px 6px;border-bottom:1px solid #e5e5e5;vertical-align:top;font-size:.95rem;}
+table.stores td.n{color:#999;width:2.5em;text-align:right;}
+table.stores td.d{white-space:nowrap;text-align:right;color:#015c68;font-weight:600;}
+table.stores a{color:#02899d;text-decoration:none;}
+table.stores .addr{color:#555;font-size:.88rem;}
+</style>"""
+
+
+def _escape(s: pd.Series) -> pd.Series:
+    s = s.astype(object).where(s.notna(), "").astype(str)
+    for char, entity in _ESCAPES:
+        s = s.str.replace(char, entity, regex=False)
+    return s
+
+
+def _coords(rows: pd.DataFrame) -> pd.Series:
+    lat = np.char.mod("%.6f", rows["lat"].to_numpy(dtype=np.float64))
+    lon = np.char.mod("%.6f", rows["lon"].to_numpy(dtype=np.float64))
+    return pd.Series(np.char.add(np.char.add(lat, ","), lon), index=rows.index, dtype=object)
+
+
+def nav_links(rows: pd.DataFrame, from_lat=None, from_lon=None) -> pd.Series:
+    """Google Maps directions from ``(from_lat, from_lon)`` to every row; a place link when there is no origin."""
+    if from_lat is None or from_lon is None:
+        return MAPS_PLACE + _coords(rows)
+    return f"{MAPS_DIR}{from_lat},{from_lon}/" + _coords(rows)
+
+
+def store_table(rows: pd.DataFrame, links: pd.Series, start=0) -> str:
+    """One page of stores as a single table: number, linked name, address and distance (if known)."""
+    if not len(rows):
+        return ""
+    number = pd.Series(np.arange(start + 1, start + len(rows) + 1).astype(str), index=rows.index, dtype=object)
+    cells = ("<tr><td class='n'>" + number + "</td><td><a href=\"" + _escape(links) + "\" target=\"_blank\">🏪 <b>"
+             + _escape(rows["name"]) + "</b></a><br><span class='addr'>📍 " + _escape(rows["address"]) + "</span></td>")
+    if "distance_km" in rows.columns:
+        km = np.char.mod("%.2f km", rows["distance_km"].to_numpy(dtype=np.float64))
+        cells = cells + "<td class='d'>🛣️ " + pd.Series(km, index=rows.index, dtype=object) + "</td>"
+    return STYLE + "<table class='stores'>" + "".join(cells + "</tr>") + "</table>"
+
+
+def result_list(rows: pd.DataFrame, origin=None, key="stores", page_sizes=PAGE_SIZES):
+    """Streamlit pager plus the current page of ``rows`` (already in display order) as one element."""
+    import streamlit as st
+
+    from genericbro.query import page_count, page_slice
+
+    c = st.columns([1, 1, 2])
+    page_size = c[0].selectbox("Per page", page_sizes, key=f"{key}_page_size")
+    pages = page_count(len(rows), page_size)
+    # a new result set or page size starts again at page 1
+    page = c[1].number_input("Page", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page_{len(rows)}_{page_size}")
+    start, end, _ = page_slice(rows.index, page, page_size)
+    part = rows.iloc[start:end]
+    links = nav_links(part, *(origin or (None, None)))
+    c[2].caption(f"Showing {start + 1} – {end} of {len(rows)}" + (", nearest first" if "distance_km" in rows.columns else ""))
+    st.markdown(store_table(part, links, start), unsafe_allow_html=True)
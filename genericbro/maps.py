@@ -0,0 +1,126 @@
+"""Folium layers for the Pharmacy Locator.
+
+The base map (tiles + every store as one client-side cluster layer) depends only
+on the dataset; searches only change the small overlay from ``result_layer``.
+The store points are published once per dataset version as a static JSON file
+(see :func:`publish_points`) that the browser fetches and caches, so a rerun
+sends a few KB of map script instead of every store.
+Folium is imported on first use (it costs ~0.4 s), so importing this module is cheap.
+"""
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+GOOGLE_STREET = "https://{s}.google.com/vt/lyrs=m&x={x}&y={y}&z={z}"
+GOOGLE_SATELLITE = "https://{s}.google.com/vt/lyrs=s&x={x}&y={y}&z={z}"
+ATTR = "Google Maps"
+SUBDOMAINS = ["mt0", "mt1", "mt2", "mt3"]
+INDIA_CENTER, INDIA_ZOOM = (22.5, 80.0), 5
+STATIC_DIR = "static"  # served at app/static/ (.streamlit/config.toml)
+
+_STORE_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindTooltip(row[2]);
+    return marker;
+}
+"""
+
+# the map runs in the component iframe under <base>/component/, static files are under <base>/app/static/
+_LOAD_STORES = """
+{% macro script(this, kwargs) %}
+    fetch(window.location.pathname.split("/component/")[0] + "/app/static/{{ this.file }}")
+        .then(function (r) { return r.json(); })
+        .then(function (data) { {{ this.cluster }}.addLayers(data.map({{ this.callback }})); });
+{% endmacro %}
+"""
+
+
+def store_points(df: pd.DataFrame) -> list:
+    """``[[lat, lon, tooltip], ...]`` for every store, the cluster layer's only data."""
+    tips = df["name"].astype(str) + "<br>" + df["address"].astype(str)
+    return [[float(a), float(b), t] for a, b, t in zip(df["lat"], df["lon"], tips)]
+
+
+def publish_points(points, version, static_dir=STATIC_DIR, keep=3):
+    """Write ``points`` as ``stores.<version>.json`` under ``static_dir`` and return the file name.
+
+    Older versions past the newest ``keep`` are pruned. Returns ``None`` when the
+    directory is not writable; :func:`base_map` then embeds the points instead.
+    """
+    name = f"stores.{version}.json"
+    out = Path(static_dir)
+    try:
+        if not (out / name).exists():
+            out.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=out, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(points, fh, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, out / name)  # atomic, so a browser never fetches a partial file
+        for old in sorted(out.glob("stores.*.json"), key=lambda p: p.stat().st_mtime_ns)[:-keep]:
+            old.unlink(missing_ok=True)
+    except OSError:
+        return None
+    return name
+
+
+def base_map(points, file=None) -> "folium.Map":
+    """Tiles plus every store as one cluster layer, loaded from the published ``file`` when there is one."""
+    import folium
+    from branca.element import MacroElement
+    from folium.plugins import FastMarkerCluster, MarkerCluster
+    from folium.template import Template
+
+    fmap = folium.Map(location=INDIA_CENTER, zoom_start=INDIA_ZOOM, control_scale=True, tiles=None)
+    folium.TileLayer(GOOGLE_STREET, name="Street View", attr=ATTR, subdomains=SUBDOMAINS).add_to(fmap)
+    folium.TileLayer(GOOGLE_SATELLITE, name="Satellite View", attr=ATTR, subdomains=SUBDOMAINS).add_to(fmap)
+    if file is None:
+        FastMarkerCluster(points, callback=_STORE_CALLBACK, name="All Jan Aushadhi stores").add_to(fmap)
+    else:
+        cluster = MarkerCluster(name="All Jan Aushadhi stores").add_to(fmap)
+        loader = MacroElement()
+        loader._template = Template(_LOAD_STORES)
+        loader.file, loader.cluster, loader.callback = file, cluster.get_name(), _STORE_CALLBACK.strip()
+        fmap.add_child(loader)
+    folium.LayerControl(position="topright").add_to(fmap)
+    return fmap
+
+
+def result_layer(rows: pd.DataFrame, user_location=None, highlight_name=None) -> "folium.FeatureGroup":
+    """Search results as one GeoJSON layer of circle markers, plus the user's position."""
+    import folium
+
+    fg = folium.FeatureGroup(name="Results")
+    if user_location:
+        folium.Marker(
+            location=user_location,
+            tooltip="📍 You are here",
+            icon=folium.Icon(color="red", icon="user", prefix="fa"),
+        ).add_to(fg)
+    if len(rows):
+        features = [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+             "properties": {"name": str(name), "address": str(addr), "hl": bool(highlight_name) and name == highlight_name}}
+            for lat, lon, name, addr in zip(rows["lat"], rows["lon"], rows["name"], rows["address"])
+        ]
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            marker=folium.CircleMarker(radius=7, weight=2, fill=True, fill_opacity=0.9),
+            style_function=lambda f: {"color": "white", "fillColor": "orange" if f["properties"]["hl"] else "#02899d"},
+            tooltip=folium.GeoJsonTooltip(fields=["name", "address"], labels=False),
+        ).add_to(fg)
+    return fg
+
+
+def view_for(lats, lons):
+    """``(center, zoom)`` roughly fitting the given points, like ``fit_bounds``."""
+    lats, lons = list(lats), list(lons)
+    if not lats:
+        return INDIA_CENTER, INDIA_ZOOM
+    span = max(max(lats) - min(lats), max(lons) - min(lons), 0.005)
+    zoom = int(min(16, max(4, math.floor(math.log2(360 / span)) - 1)))
+    return ((max(lats) + min(lats)) / 2, (max(lons) + min(lons)) / 2), zoom
@@ -0,0 +1,118 @@
+"""Fuzzy matching of OCR text against catalogue medicine names."""
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+FORM_PREFIXES = {"tab", "tabs", "tablet", "tablets", "cap", "caps", "capsule", "capsules",
+                 "syrup", "syp", "susp", "inj", "oint", "cream", "gel", "drops"}
+
+
+def normalize(name) -> str:
+    """Lower-case, punctuation-free name with leading dosage-form words stripped."""
+    words = re.sub(r"[^0-9a-z]+", " ", str(name).lower()).split()
+    while len(words) > 1 and words[0] in FORM_PREFIXES:
+        words = words[1:]
+    return " ".join(words)
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Match(NamedTuple):
+    phrase: str
+    key: str
+    score: float
+    positions: tuple
+
+
+class MedicineMatcher:
+    """Trigram inverted index over normalized catalogue names, built once.
+
+    Candidates are shortlisted by trigram Dice overlap and re-ranked with the same
+    ``SequenceMatcher`` ratio ``difflib.get_close_matches`` uses, so cutoffs keep
+    their old meaning while only a handful of names are compared per query.
+    """
+
+    def __init__(self, names, shortlist=8, min_len=3, min_dice=0.5):
+        rows = defaultdict(list)
+        for pos, name in enumerate(names):
+            if isinstance(name, str) and name.strip():
+                rows[normalize(name)].append(pos)
+        rows.pop("", None)
+        self.keys = list(rows)
+        self.rows = {k: tuple(v) for k, v in rows.items()}
+        self.max_words = max((k.count(" ") + 1 for k in self.keys), default=1)
+        self.shortlist, self.min_len, self.min_dice = shortlist, min_len, min_dice
+        self._key_len = np.fromiter((len(k) for k in self.keys), dtype=np.int32, count=len(self.keys))
+        self.best = lru_cache(maxsize=50_000)(self._best)  # thread-safe: the matcher is shared process-wide
+
+        postings = defaultdict(list)
+        self._gram_count = np.empty(len(self.keys), dtype=np.int32)
+        for i, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self._gram_count[i] = len(grams)
+            for g in grams:
+                postings[g].append(i)
+        self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def candidates(self, query, n=5, cutoff=0.0):
+        """Ranked ``[(key, score), ...]`` for ``query``, best first."""
+        q = normalize(query)
+        if len(q) < self.min_len:
+            return []
+        if q in self.rows:
+            return [(q, 1.0)]
+        grams = trigrams(q)
+        hits = [self._postings[g] for g in grams if g in self._postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        dice = 2 * shared / (len(grams) + self._gram_count)
+        # SequenceMatcher.ratio() can never exceed 2*min(len)/(sum of lens)
+        bound = 2 * np.minimum(len(q), self._key_len) / (len(q) + self._key_len)
+        dice[(bound < cutoff) | (dice < min(cutoff, self.min_dice))] = 0
+        k = min(self.shortlist, int((dice > 0).sum()))
+        if not k:
+            return []
+        top = np.argpartition(-dice, k - 1)[:k]
+        scored = []
+        for i in top:
+            key = self.keys[i]
+            score = SequenceMatcher(None, q, key).ratio()
+            if score >= cutoff:
+                scored.append((key, score))
+        scored.sort(key=lambda ks: (-ks[1], ks[0]))
+        return scored[:n]
+
+    def _best(self, query, cutoff=0.85):
+        found = self.candidates(query, n=1, cutoff=cutoff)
+        return found[0] if found else None
+
+    def match_tokens(self, tokens, cutoff=0.85):
+        """Left-to-right phrase matching; at each token the best-scoring phrase wins."""
+        out, i = [], 0
+        while i < len(tokens):
+            found = None
+            for n in range(1, min(self.max_words, len(tokens) - i) + 1):
+                hit = self.best(" ".join(tokens[i:i + n]), cutoff)
+                if hit and (found is None or hit[1] >= found[1][1]):
+                    found = (n, hit)
+            if found:
+                n, (key, score) = found
+                out.append(Match(" ".join(tokens[i:i + n]), key, score, self.rows[key]))
+                i += n
+            else:
+                i += 1
+        return out
+
+    def match_lines(self, lines, cutoff=0.85):
+        return [m for line in lines for m in self.match_tokens(line.split(), cutoff)]
@@ -0,0 +1,208 @@
+"""Prescription OCR: page-at-a-time rasterization fanned out to a process pool.
+
+Each page is cleaned up before tesseract sees it (grayscale, long side capped at
+``MAX_SIDE``, deskewed, adaptively binarized) and read with ``image_to_data``, so
+every word keeps its confidence and line. :meth:`OcrResult.confident_text` keeps
+only confidently read words and their neighbours for the matcher.
+:func:`cached_ocr_document` shares results across processes via
+:func:`genericbro.cache.shared_cache`.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from genericbro.cache import make_key, shared_cache
+from genericbro.instrument import miss
+
+DEFAULT_DPI = 200
+DEFAULT_MAX_PAGES = 10
+MIN_CONF = 60
+MAX_SIDE = 2500          # ~A4 at 300 DPI; bigger phone photos only slow tesseract down
+MAX_SKEW = 5.0           # degrees searched either way when deskewing
+OCR_VERSION = 2          # bump when preprocessing or extraction changes, to retire cached results
+OCR_TTL = 30 * 24 * 3600
+
+_executor = None
+
+
+class Word(NamedTuple):
+    text: str
+    conf: float
+    line: int
+
+
+class PageResult(NamedTuple):
+    page: int
+    text: str
+    seconds: float
+    words: tuple = ()
+
+
+class OcrResult(NamedTuple):
+    digest: str
+    pages: list
+
+    @property
+    def text(self):
+        return "\n".join(p.text for p in self.pages)
+
+    @property
+    def seconds(self):
+        return sum(p.seconds for p in self.pages)
+
+    def confident_text(self, min_conf=MIN_CONF, neighbours=1):
+        """One line per run of words read with ``min_conf`` or better, widened by ``neighbours``
+        words either side so a multi-word name with one shaky word survives. Pages without
+        word data contribute their full text."""
+        out = []
+        for p in self.pages:
+            out.extend(confident_runs(p.words, min_conf, neighbours) if p.words else p.text.splitlines())
+        return "\n".join(out)
+
+
+def confident_runs(words, min_conf=MIN_CONF, neighbours=1) -> list:
+    lines = {}
+    for w in words:
+        lines.setdefault(w.line, []).append(w)
+    runs = []
+    for line in lines.values():
+        keep = [False] * len(line)
+        for i, w in enumerate(line):
+            if w.conf >= min_conf:
+                for j in range(max(0, i - neighbours), min(len(line), i + neighbours + 1)):
+                    keep[j] = True
+        run = []
+        for w, k in zip(line, keep):
+            if k:
+                run.append(w.text)
+            elif run:
+                runs.append(" ".join(run))
+                run = []
+        if run:
+            runs.append(" ".join(run))
+    return runs
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def executor(workers=None):
+    """Process pool shared by every caller in this process, created on first use.
+
+    Workers are spawned rather than forked: the server is multi-threaded, and a
+    forked child can inherit a lock held by another thread and hang.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _binarize(gray, window=None, offset=10):
+    """Dark-on-light mask of an "L" image: pixels ``offset`` below their local mean."""
+    import numpy as np
+    from PIL import ImageFilter
+
+    radius = (window or max(15, min(gray.size) // 40)) // 2
+    mean = np.asarray(gray.filter(ImageFilter.BoxBlur(radius)), dtype=np.int16)
+    return np.asarray(gray, dtype=np.int16) < mean - offset
+
+
+def _skew_angle(mask, max_skew=MAX_SKEW, step=0.5):
+    """Rotation (degrees, counter-clockwise) that makes text rows sharpest in the row profile."""
+    import numpy as np
+    from PIL import Image
+
+    small = Image.fromarray((mask * 255).astype(np.uint8))
+    best, best_score = 0.0, -1.0
+    for angle in np.arange(-max_skew, max_skew + step / 2, step):
+        rows = np.asarray(small.rotate(float(angle), resample=Image.NEAREST)).sum(axis=1, dtype=np.float64)
+        score = float(np.square(np.diff(rows)).sum())
+        if score > best_score:
+            best, best_score = float(angle), score
+    return best
+
+
+def preprocess(image, max_side=MAX_SIDE, max_skew=MAX_SKEW):
+    """Grayscale, long side capped at ``max_side``, deskewed, binarized to black on white."""
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(image).convert("L")
+    scale = max_side / max(img.size)
+    if scale < 1:
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+    if max_skew:
+        small = img.copy()
+        small.thumbnail((800, 800))
+        angle = _skew_angle(_binarize(small), max_skew)
+        if angle:
+            img = img.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return Image.fromarray(np.where(_binarize(img), 0, 255).astype(np.uint8))
+
+
+def _ocr_image(image):
+    import pytesseract
+    data = pytesseract.image_to_data(preprocess(image), output_type=pytesseract.Output.DICT)
+    words, lines = [], {}
+    for text, conf, block, par, line in zip(data["text"], data["conf"], data["block_num"], data["par_num"], data["line_num"]):
+        text = str(text).strip()
+        if text:
+            words.append(Word(text, float(conf), lines.setdefault((block, par, line), len(lines))))
+    by_line = [[] for _ in lines]
+    for w in words:
+        by_line[w.line].append(w.text)
+    return "\n".join(" ".join(line) for line in by_line), tuple(words)
+
+
+def ocr_pdf_page(data: bytes, page: int, dpi=DEFAULT_DPI) -> PageResult:
+    """Rasterize and OCR a single 1-based ``page``; only that page is held in memory."""
+    from pdf2image import convert_from_bytes
+    start = time.perf_counter()
+    images = convert_from_bytes(data, dpi=dpi, first_page=page, last_page=page)
+    text, words = _ocr_image(images[0]) if images else ("", ())
+    return PageResult(page, text, time.perf_counter() - start, words)
+
+
+def ocr_image_bytes(data: bytes) -> PageResult:
+    from PIL import Image
+    start = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as image:
+        text, words = _ocr_image(image)
+    return PageResult(1, text, time.perf_counter() - start, words)
+
+
+def pdf_page_count(data: bytes) -> int:
+    from pdf2image import pdfinfo_from_bytes
+    return int(pdfinfo_from_bytes(data)["Pages"])
+
+
+def ocr_document(data: bytes, is_pdf: bool, dpi=DEFAULT_DPI, max_pages=DEFAULT_MAX_PAGES, parallel=True) -> OcrResult:
+    """OCR an uploaded PDF or image, at most ``max_pages`` pages, in page order."""
+    digest = content_hash(data)
+    if not is_pdf:
+        return OcrResult(digest, [ocr_image_bytes(data)])
+    pages = range(1, min(pdf_page_count(data), max_pages) + 1)
+    if parallel and len(pages) > 1:
+        pool = executor()
+        results = list(pool.map(ocr_pdf_page, [data] * len(pages), pages, [dpi] * len(pages)))
+    else:
+        results = [ocr_pdf_page(data, p, dpi) for p in pages]
+    return OcrResult(digest, results)
+
+
+def cached_ocr_document(data: bytes, is_pdf: bool, dpi=DEFAULT_DPI, max_pages=DEFAULT_MAX_PAGES, parallel=True,
+                        ttl=OCR_TTL) -> OcrResult:
+    """:func:`ocr_document` through the shared result cache, keyed by content hash and settings."""
+    key = make_key("ocr", OCR_VERSION, content_hash(data), is_pdf, dpi, max_pages)
+
+    def compute():
+        miss()
+        return ocr_document(data, is_pdf, dpi, max_pages, parallel)
+    return shared_cache().get_or_set(key, compute, ttl)
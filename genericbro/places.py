@@ -0,0 +1,97 @@
+"""City, locality and PIN lookups over the store list, built once per dataset.
+
+Address words are matched as substrings of address tokens, so "nagar" finds
+"Gandhinagar" and "57SAI" just as the plain ``str.contains`` scan did. Only the
+distinct tokens are scanned (one regex pass over them, joined by newlines), not
+every address. A query matches where each of its words is inside some token;
+the words need not be adjacent.
+"""
+import re
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+_TOKEN = re.compile(r"[a-z]+|[0-9]+")  # "57SAI NAGAR" -> 57, sai, nagar
+
+
+def tokens(text) -> list:
+    return _TOKEN.findall(str(text).lower())
+
+
+def _postings(keys) -> dict:
+    """key → sorted row positions, from an iterable of (key, position) pairs."""
+    out = {}
+    for key, pos in keys:
+        out.setdefault(key, []).append(pos)
+    return {k: np.unique(np.asarray(v, dtype=np.intp)) for k, v in out.items()}
+
+
+def _prefix_range(sorted_keys, prefix):
+    lo = bisect_left(sorted_keys, prefix)
+    hi = bisect_left(sorted_keys, prefix + "\uffff")
+    return sorted_keys[lo:hi]
+
+
+class PlaceIndex:
+    """Sorted city names for autocomplete, an inverted address-token index and PIN maps."""
+
+    def __init__(self, df: pd.DataFrame):
+        n = len(df)
+        cities = {}
+        for col in ("district name", "state name"):
+            if col in df.columns:
+                for pos, name in enumerate(df[col]):
+                    if isinstance(name, str) and name.strip():
+                        cities.setdefault(name.strip().lower(), (name.strip().title(), []))[1].append(pos)
+        self._city_rows = {k: np.asarray(v[1], dtype=np.intp) for k, v in cities.items()}
+        self._city_title = {k: v[0] for k, v in cities.items()}
+        self.city_keys = sorted(self._city_rows)
+
+        self._token_rows = _postings(((t, pos) for pos, a in enumerate(df["address"]) if isinstance(a, str)
+                                      for t in set(tokens(a))))
+        self.vocab = sorted(self._token_rows)
+        self._vocab_text = "\n".join(self.vocab)
+        self._vocab_starts = np.cumsum([0] + [len(t) + 1 for t in self.vocab[:-1]])
+
+        self._pin_rows = _postings(zip(df["pin"], range(n)))
+        centres = df.groupby("pin")[["lat", "lon"]].mean()
+        self.pin_centres = dict(zip(centres.index, zip(centres["lat"], centres["lon"])))
+
+    def suggest_cities(self, prefix, limit=5) -> list:
+        """"Did you mean" hints: cities starting with ``prefix``, excluding an exact match."""
+        p = prefix.strip().lower()
+        return [self._city_title[k] for k in _prefix_range(self.city_keys, p) if k != p][:limit]
+
+    def _containing(self, word) -> np.ndarray:
+        """Rows with an address token that contains ``word``."""
+        starts = [m.start() for m in re.finditer(re.escape(word), self._vocab_text)]
+        if not starts:
+            return np.empty(0, dtype=np.intp)
+        ids = np.unique(np.searchsorted(self._vocab_starts, starts, side="right") - 1)
+        return np.unique(np.concatenate([self._token_rows[self.vocab[i]] for i in ids]))
+
+    def locality(self, text) -> np.ndarray:
+        """Stores whose address has every word of ``text`` inside one of its tokens."""
+        words = tokens(text)
+        if not words:
+            return np.empty(0, dtype=np.intp)
+        hits = None
+        for w in sorted(words, key=len, reverse=True):  # longest first: the rarest, so the intersection shrinks fast
+            rows = self._containing(w)
+            hits = rows if hits is None else np.intersect1d(hits, rows, assume_unique=True)
+            if not len(hits):
+                break
+        return hits
+
+    def city(self, name) -> np.ndarray:
+        """Stores in a district/state starting with ``name`` or with an address matching it (see :meth:`locality`)."""
+        keys = _prefix_range(self.city_keys, name.strip().lower())
+        by_name = np.concatenate([self._city_rows[k] for k in keys]) if keys else np.empty(0, dtype=np.intp)
+        return np.union1d(by_name, self.locality(name))
+
+    def pin(self, pin) -> np.ndarray:
+        return self._pin_rows.get(str(pin).strip(), np.empty(0, dtype=np.intp))
+
+    def centre(self, pin):
+        return self.pin_centres.get(str(pin).strip())
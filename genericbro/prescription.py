@@ -0,0 +1,52 @@
+"""OCR text → catalogue matches, cheapest same-formulation generics and savings."""
+import re
+
+import pandas as pd
+
+from genericbro.catalogue import COL_DOSAGE, COL_FORMULATION, COL_NAME, COL_PRICE_BRAND, COL_PRICE_GENERIC
+
+
+def clean_lines(text) -> list:
+    """Lower-cased OCR lines with digits and punctuation removed."""
+    out = []
+    for line in str(text).splitlines():
+        line = re.sub(r"[0-9]+", "", line)
+        line = re.sub(r"[^\w\s]", "", line)
+        line = line.strip().lower()
+        if line:
+            out.append(line)
+    return out
+
+
+def _price(v):
+    return None if pd.isna(v) else round(float(v), 2)
+
+
+def match_positions(lines, matcher, cutoff=0.85) -> list:
+    """Sorted catalogue row positions matched anywhere in ``lines``."""
+    return sorted({pos for m in matcher.match_lines(lines, cutoff) for pos in m.positions})
+
+
+def summarize(positions, df: pd.DataFrame, groups) -> dict:
+    """Matched rows with their cheapest same-formulation generic and total savings."""
+    matches, total = [], 0.0
+    for pos in positions:
+        row = df.iloc[pos]
+        best = groups.cheapest(pos)
+        cheapest = None if best is None else df.iloc[best]
+        generic = row[COL_PRICE_GENERIC] if cheapest is None else cheapest[COL_PRICE_GENERIC]
+        saving = _price(row[COL_PRICE_BRAND] - generic)
+        total += saving or 0.0
+        matches.append({
+            "row": int(pos),
+            "name": str(row[COL_NAME]),
+            "dosage": None if pd.isna(row[COL_DOSAGE]) else str(row[COL_DOSAGE]),
+            "formulation": None if pd.isna(row[COL_FORMULATION]) else str(row[COL_FORMULATION]),
+            "branded_price": _price(row[COL_PRICE_BRAND]),
+            "generic_price": _price(row[COL_PRICE_GENERIC]),
+            "cheapest_generic": None if cheapest is None else {
+                "row": int(best), "name": str(cheapest[COL_NAME]), "generic_price": _price(cheapest[COL_PRICE_GENERIC]),
+            },
+            "savings": saving,
+        })
+    return {"matches": matches, "total_savings": round(total, 2)}
@@ -0,0 +1,113 @@
+"""Row-position queries over the catalogue: filtering, sorting and paging without frame copies."""
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from genericbro.dosage import StrengthIndex, dosage_label, label_order
+
+
+def sort_positions(values, positions, ascending=True) -> np.ndarray:
+    """``positions`` ordered by ``values[positions]``; stable, missing values last."""
+    positions = np.asarray(positions, dtype=np.intp)
+    keys = pd.to_numeric(pd.Series(np.asarray(values)[positions]), errors="coerce").to_numpy(dtype=np.float64)
+    order = np.argsort(keys if ascending else -keys, kind="stable")
+    return positions[order]
+
+
+def page_count(total, page_size) -> int:
+    return max(1, -(-total // page_size))
+
+
+def page_slice(positions, page, page_size) -> tuple:
+    """``(start, end, positions on that page)`` for a 1-based ``page``."""
+    start = (page - 1) * page_size
+    end = min(start + page_size, len(positions))
+    return start, end, positions[start:end]
+
+
+def _index(series: pd.Series) -> dict:
+    """Value → sorted row positions, for a column with a RangeIndex."""
+    codes, uniques = pd.factorize(series, sort=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {u: _frozen(order[bounds[i]:bounds[i + 1]]) for i, u in enumerate(uniques)}
+
+
+def _frozen(a) -> np.ndarray:
+    a = np.asarray(a, dtype=np.intp)
+    a.flags.writeable = False
+    return a
+
+
+class QueryResult(NamedTuple):
+    hits: np.ndarray
+    same: np.ndarray
+
+
+class CatalogueQuery:
+    """Precomputed per-type/dosage/name/formulation row indexes plus an LRU of searches.
+
+    ``search`` arguments are the raw filter values (``None`` meaning "all");
+    ``strength`` is a ``(unit, lo, hi)`` range and ``same_strength`` narrows the
+    same-formulation rows to the strengths of the exact matches. Results are
+    read-only position arrays already in display order.
+    """
+
+    def __init__(self, df: pd.DataFrame, groups, cache_size=1024):
+        from genericbro.catalogue import COL_NAME, COL_FORMULATION, COL_TYPE
+
+        self.df, self.groups = df, groups
+        self.all_rows = _frozen(np.arange(len(df)))
+        self.by_type = _index(df["_type_clean"])
+        self.by_dosage = _index(df["_dosage_clean"])
+        self.by_form = _index(df["_form_clean"])
+        self.by_name = _index(df[COL_NAME])
+        self.strength = StrengthIndex(df)
+        self._dosage_rank = label_order(df)
+        self.types = sorted(df[COL_TYPE].dropna().unique())
+
+        self._option_cols = {"dosage": "_dosage_clean", "name": COL_NAME, "formulation": COL_FORMULATION}
+        self.options = lru_cache(maxsize=256)(self._options)
+        self.search = lru_cache(maxsize=cache_size)(self._search)
+
+    def base(self, typ=None):
+        if typ is None:
+            return self.all_rows
+        return self.by_type.get(str(typ).strip().lower(), self.all_rows[:0])
+
+    def _options(self, kind, typ=None):
+        col = self.df[self._option_cols[kind]].iloc[self.base(typ)]
+        if kind == "dosage":
+            return tuple(sorted(col.dropna().unique(), key=self._dosage_rank.get))
+        return tuple(sorted(col.dropna().unique()))
+
+    def _search(self, typ=None, dose=None, name=None, formulation=None, sort=None, ascending=True,
+                strength=None, same_strength=False):
+        empty = self.all_rows[:0]
+        base = self.base(typ)
+        if strength is not None:
+            base = np.intersect1d(base, self.strength.range(strength[1], strength[2], strength[0]), assume_unique=True)
+        dose = dosage_label(dose)
+        hits = base
+        if name is not None:
+            hits = np.intersect1d(hits, self.by_name.get(name, empty), assume_unique=True)
+        if formulation is not None:
+            hits = np.intersect1d(hits, self.by_form.get(str(formulation).strip().lower(), empty), assume_unique=True)
+        if dose is not None:
+            hits = np.intersect1d(hits, self.by_dosage.get(dose, empty), assume_unique=True)
+
+        same = empty
+        if name is not None and len(hits):
+            same = np.intersect1d(np.sort(self.groups.members(hits)), base, assume_unique=True)
+            if dose is not None:
+                same = np.intersect1d(same, self.by_dosage.get(dose, empty), assume_unique=True)
+            if same_strength:
+                strengths = np.unique(np.concatenate([self.strength.same(h) for h in hits]))
+                same = np.intersect1d(same, strengths, assume_unique=True)
+
+        if sort is not None:
+            values = self.df[sort].to_numpy()
+            hits, same = sort_positions(values, hits, ascending), sort_positions(values, same, ascending)
+        return QueryResult(_frozen(hits), _frozen(same))
@@ -0,0 +1,261 @@
+"""Hot reload of ``Final.csv`` and ``GenericP.csv`` without restarts or blocked sessions.
+
+A :class:`DataSource` owns the current :class:`Generation` of one table: its
+rows, content version and the indexes built from them. A daemon thread polls the
+CSV (every ``GENERICBRO_REFRESH_SECONDS``, default 30, ``0`` disables). When the
+content changes, the new rows are diffed against the current table by key
+(Kendra code, or name + dosage) and applied so surviving rows keep their
+positions; only indexes that read a changed column are rebuilt, the rest carry
+over. The finished generation is swapped in with one assignment, so a rerun that
+already holds the old one finishes on it. Each generation is also written to a
+versioned snapshot.
+
+Row order therefore depends on the reload history: a process that reloaded and
+one started on the same CSV share a ``version`` but not positions. Anything
+that stores row positions outside the process keys them by
+:attr:`Generation.layout` instead.
+
+Take one generation per rerun or request so every index agrees::
+
+    cat = source.current
+    df, engine = cat.df, cat.index("query")
+
+Preview what an update would change with::
+
+    python -m genericbro.refresh catalogue Final.csv new/Final.csv
+"""
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from genericbro import maps
+from genericbro.analytics import SavingsSummary
+from genericbro.catalogue import (
+    COL_DOSAGE, COL_FORMULATION, COL_NAME, COL_PRICE_GENERIC, COL_SAVE_PCT, COL_SIDE_EFF, COL_TYPE, COL_USES,
+    read_catalogue,
+)
+from genericbro.equivalence import FormulationGroups
+from genericbro.fulltext import FullTextIndex
+from genericbro.geo import StoreIndex
+from genericbro.instrument import miss
+from genericbro.match import MedicineMatcher
+from genericbro.places import PlaceIndex
+from genericbro.query import CatalogueQuery
+from genericbro.snapshot import load_snapshot, source_version, write_snapshot, write_versioned_snapshot
+from genericbro.stores import read_stores
+from genericbro.suggest import Suggester
+
+POLL_ENV = "GENERICBRO_REFRESH_SECONDS"
+DEFAULT_POLL_SECONDS = 30
+KEEP_GENERATIONS = 3
+
+log = logging.getLogger("genericbro.refresh")
+
+
+class IndexSpec(NamedTuple):
+    build: Callable              # build(generation) -> index
+    columns: frozenset = None    # columns the index reads; None means every column
+    depends: tuple = ()          # other indexes it is built from
+
+
+class TableSpec(NamedTuple):
+    read: Callable               # read(path) -> tidy DataFrame
+    key: tuple                   # columns identifying a row across versions
+    indexes: dict
+
+
+CATALOGUE = TableSpec(read_catalogue, (COL_NAME, COL_DOSAGE), {
+    "groups": IndexSpec(lambda g: FormulationGroups(g.df), frozenset({COL_FORMULATION, COL_PRICE_GENERIC})),
+    "query": IndexSpec(lambda g: CatalogueQuery(g.df, g.index("groups")), depends=("groups",)),
+    "matcher": IndexSpec(lambda g: MedicineMatcher(g.df[COL_NAME]), frozenset({COL_NAME})),
+    "fulltext": IndexSpec(lambda g: FullTextIndex(g.df),
+                          frozenset({COL_NAME, COL_FORMULATION, COL_USES, COL_SIDE_EFF, COL_TYPE})),
+    "suggest": IndexSpec(lambda g: Suggester(g.df), frozenset({COL_NAME, COL_FORMULATION, COL_TYPE})),
+    "analytics": IndexSpec(lambda g: SavingsSummary(g.df, g.index("groups")),
+                           frozenset({COL_TYPE, COL_SAVE_PCT, COL_PRICE_GENERIC, COL_NAME, COL_DOSAGE}), ("groups",)),
+})
+
+STORES = TableSpec(read_stores, ("kendra code",), {
+    "grid": IndexSpec(lambda g: StoreIndex.from_frame(g.df), frozenset({"lat", "lon"})),
+    "places": IndexSpec(lambda g: PlaceIndex(g.df),
+                        frozenset({"address", "district name", "state name", "pin", "lat", "lon"})),
+    "points": IndexSpec(lambda g: maps.store_points(g.df), frozenset({"name", "address", "lat", "lon"})),
+    "points_file": IndexSpec(lambda g: maps.publish_points(g.index("points"), g.version),
+                             frozenset({"name", "address", "lat", "lon"}), ("points",)),
+})
+
+
+class Delta(NamedTuple):
+    added: int
+    removed: int
+    changed: int
+    columns: frozenset           # columns with at least one changed value
+
+    @property
+    def reshaped(self) -> bool:
+        """Rows were added or removed, so row positions moved."""
+        return bool(self.added or self.removed)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.reshaped or self.changed or self.columns)
+
+
+def row_keys(df: pd.DataFrame, key) -> pd.MultiIndex:
+    """Normalized key columns plus an occurrence number, so duplicate keys still pair up in order."""
+    parts = [df[c].astype(str).str.strip().str.lower().fillna("").to_numpy() for c in key]
+    occurrence = pd.DataFrame(dict(enumerate(parts))).groupby(list(range(len(parts))), sort=False, dropna=False).cumcount()
+    return pd.MultiIndex.from_arrays(parts + [occurrence.to_numpy()])
+
+
+def apply_delta(old: pd.DataFrame, new: pd.DataFrame, key) -> tuple:
+    """``new``'s rows laid out in ``old``'s order (added rows appended, removed rows dropped) and the delta."""
+    new_pos = pd.Series(np.arange(len(new)), index=row_keys(new, key))
+    at = new_pos.reindex(row_keys(old, key)).to_numpy(dtype=np.float64)
+    kept = ~np.isnan(at)
+    kept_new = at[kept].astype(np.intp)
+    added = np.setdiff1d(np.arange(len(new)), kept_new)
+    merged = new.iloc[np.concatenate([kept_new, added])].reset_index(drop=True)
+
+    before = old.iloc[np.flatnonzero(kept)].reset_index(drop=True)
+    after = merged.iloc[:len(kept_new)]
+    changed_rows = np.zeros(len(kept_new), dtype=bool)
+    columns = set(old.columns) ^ set(new.columns)
+    for c in new.columns.intersection(old.columns):
+        a, b = before[c].astype(object), after[c].astype(object)
+        diff = ~((a == b) | (a.isna() & b.isna())).to_numpy()
+        if diff.any():
+            columns.add(c)
+            changed_rows |= diff
+    return merged, Delta(len(added), int((~kept).sum()), int(changed_rows.sum()), frozenset(columns))
+
+
+class Generation:
+    """One immutable version of a table; indexes are built on first use and then shared."""
+
+    def __init__(self, spec: TableSpec, version, df, delta=None):
+        self.spec, self.version, self.df, self.delta = spec, version, df, delta
+        self.loaded_at = time.time()
+        self._indexes = {}
+        self._layout = None
+        self._lock = threading.RLock()
+
+    @property
+    def layout(self) -> str:
+        """``version`` plus a fingerprint of the row keys in order: equal layouts agree on every row position."""
+        if self._layout is None:
+            rows = pd.util.hash_pandas_object(self.df[list(self.spec.key)], index=False).to_numpy()
+            self._layout = f"{self.version}:{hashlib.sha1(rows.tobytes()).hexdigest()[:16]}"
+        return self._layout
+
+    def index(self, name):
+        idx = self._indexes.get(name)
+        if idx is None:
+            with self._lock:
+                idx = self._indexes.get(name)
+                if idx is None:
+                    miss()
+                    idx = self._indexes[name] = self.spec.indexes[name].build(self)
+        return idx
+
+    def reusable(self, name) -> bool:
+        """Whether index ``name`` of the previous generation is still valid for this one."""
+        if self.delta is None or self.delta.reshaped:
+            return False
+        spec = self.spec.indexes[name]
+        columns = spec.columns if spec.columns is not None else frozenset(self.df.columns)
+        return not (columns & self.delta.columns) and all(self.reusable(d) for d in spec.depends)
+
+
+class DataSource:
+    def __init__(self, path, spec: TableSpec, snapshot_dir=None, poll_seconds=None):
+        self.path, self.spec, self.snapshot_dir = path, spec, snapshot_dir
+        self._stat = _stat(path)
+        self.current = Generation(spec, source_version(path), load_snapshot(path, spec.read, snapshot_dir))
+        self.history = deque([self.current], maxlen=KEEP_GENERATIONS)
+        self._refresh_lock = threading.Lock()
+        if poll_seconds is None:
+            poll_seconds = float(os.environ.get(POLL_ENV, DEFAULT_POLL_SECONDS))
+        if poll_seconds > 0:
+            threading.Thread(target=self._poll, args=(poll_seconds,), name=f"refresh:{path}", daemon=True).start()
+
+    def _poll(self, seconds):
+        while True:
+            time.sleep(seconds)
+            try:
+                self.refresh()
+            except Exception:
+                log.exception("refreshing %s failed; still serving version %s", self.path, self.current.version)
+
+    def refresh(self, force=False):
+        """Load the source if its content changed and swap in the new generation (else ``None``)."""
+        with self._refresh_lock:
+            stat = _stat(self.path)
+            if stat == self._stat and not force:
+                return None
+            self._stat = stat
+            old, version = self.current, source_version(self.path)
+            if version == old.version:
+                return None
+            start = time.perf_counter()
+            df, delta = apply_delta(old.df, self.spec.read(self.path), self.spec.key)
+            gen = Generation(self.spec, version, df, delta)
+            # indexes the old generation had built are ready before the swap, so no rerun waits on them
+            for name in old._indexes:
+                if gen.reusable(name):
+                    gen._indexes[name] = old._indexes[name]
+            for name in old._indexes:
+                gen.index(name)
+            try:
+                write_snapshot(df, self.path, self.snapshot_dir)
+                write_versioned_snapshot(df, self.path, version, self.snapshot_dir, keep=KEEP_GENERATIONS)
+            except OSError:
+                pass
+            self.current = gen
+            self.history.append(gen)
+            log.info("%s: %s -> %s (+%d -%d ~%d rows, columns %s; reused %s) in %.0f ms", self.path, old.version,
+                     version, delta.added, delta.removed, delta.changed, sorted(delta.columns),
+                     sorted(n for n in gen._indexes if gen._indexes[n] is old._indexes.get(n)),
+                     (time.perf_counter() - start) * 1e3)
+            return gen
+
+    def rollback(self):
+        """Serve the previous generation again (until the source changes once more)."""
+        with self._refresh_lock:
+            if len(self.history) > 1:
+                self.history.pop()
+                self.current = self.history[-1]
+            return self.current
+
+
+def _stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m genericbro.refresh", description="Show the row-level delta between two versions.")
+    ap.add_argument("table", choices=["catalogue", "stores"])
+    ap.add_argument("old")
+    ap.add_argument("new")
+    args = ap.parse_args(argv)
+    spec = CATALOGUE if args.table == "catalogue" else STORES
+    _, delta = apply_delta(spec.read(args.old), spec.read(args.new), spec.key)
+    gen = Generation(spec, None, None, delta)
+    print(f"added {delta.added}, removed {delta.removed}, changed {delta.changed} rows")
+    print(f"changed columns: {', '.join(sorted(delta.columns)) or '-'}")
+    print(f"indexes reused: {', '.join(n for n in spec.indexes if gen.reusable(n)) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
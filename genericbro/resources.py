@@ -0,0 +1,39 @@
+"""Process-wide Streamlit caches shared by every page and session.
+
+Each table is a hot-reloading :class:`genericbro.refresh.DataSource`, created
+once per process with ``st.cache_resource``. Pages take one generation per
+rerun (``cat = catalogue()``) and read the rows and indexes from it, so a
+reload that lands mid-rerun never mixes two versions. Objects are handed out by
+reference, so callers must treat them as read-only. Source creation and index
+builds call :func:`genericbro.instrument.miss` so page metrics show when a rerun
+paid for a (re)build.
+"""
+import streamlit as st
+
+from genericbro.catalogue import CATALOGUE_PATH
+from genericbro.instrument import miss
+from genericbro.refresh import CATALOGUE, STORES, DataSource, Generation
+from genericbro.stores import STORES_PATH
+
+
+@st.cache_resource(show_spinner=False)
+def catalogue_source(path=CATALOGUE_PATH):
+    miss()
+    return DataSource(path, CATALOGUE)
+
+
+@st.cache_resource(show_spinner=False)
+def stores_source(path=STORES_PATH):
+    miss()
+    return DataSource(path, STORES)
+
+
+def catalogue(path=CATALOGUE_PATH) -> Generation:
+    """The current catalogue: ``.df`` plus ``.index("query" | "groups" | "matcher" | "fulltext" | "suggest"
+    | "analytics")``."""
+    return catalogue_source(path).current
+
+
+def stores(path=STORES_PATH) -> Generation:
+    """The current store list: ``.df`` plus ``.index("grid" | "places" | "points" | "points_file")``."""
+    return stores_source(path).current
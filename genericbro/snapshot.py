@@ -0,0 +1,118 @@
+"""Feather snapshots of the cleaned CSV tables, rebuilt when the source changes.
+
+A snapshot records the size, mtime and SHA-256 of the CSV it was built from.
+Matching size and mtime is trusted outright; otherwise the CSV is hashed, so a
+fresh checkout or container image with new mtimes still reuses the snapshot.
+
+Build both snapshots ahead of time (e.g. in a container image) with::
+
+    python -m genericbro.snapshot
+"""
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import pyarrow as pa
+from pyarrow import feather
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_DIR = ".snapshots"
+META_KEY = b"genericbro"
+
+
+def file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=32)
+def _version(path, size, mtime_ns):
+    return file_sha256(path)[:16]
+
+
+def source_version(src) -> str:
+    """Short content hash of ``src``, re-hashed only when its size or mtime changes."""
+    st = os.stat(src)
+    return _version(str(src), st.st_size, st.st_mtime_ns)
+
+
+def snapshot_path(src, snapshot_dir=None) -> Path:
+    src = Path(src)
+    return Path(snapshot_dir or src.parent / SNAPSHOT_DIR) / f"{src.name}.feather"
+
+
+def _stamp(src):
+    st = os.stat(src)
+    return {"version": SNAPSHOT_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _is_fresh(meta, src):
+    stamp = _stamp(src)
+    if meta.get("version") != stamp["version"] or meta.get("size") != stamp["size"]:
+        return False
+    return meta.get("mtime_ns") == stamp["mtime_ns"] or meta.get("sha256") == file_sha256(src)
+
+
+def read_snapshot(src, snapshot_dir=None):
+    """The snapshot for ``src`` as a DataFrame, or ``None`` if missing or stale."""
+    path = snapshot_path(src, snapshot_dir)
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    meta = json.loads((table.schema.metadata or {}).get(META_KEY, b"{}"))
+    return table.to_pandas() if _is_fresh(meta, src) else None
+
+
+def write_snapshot(df, src, snapshot_dir=None, path=None) -> Path:
+    path = path or snapshot_path(src, snapshot_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {**_stamp(src), "sha256": file_sha256(src)}
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, META_KEY: json.dumps(meta).encode()})
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)  # atomic, so concurrent readers never see a partial file
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def write_versioned_snapshot(df, src, version, snapshot_dir=None, keep=3) -> Path:
+    """Also keep ``df`` as ``<name>.<version>.feather``, pruning all but the newest ``keep`` versions."""
+    base = snapshot_path(src, snapshot_dir)
+    path = write_snapshot(df, src, path=base.with_name(f"{Path(src).name}.{version}.feather"))
+    versions = sorted(base.parent.glob(f"{Path(src).name}.*.feather"), key=lambda p: p.stat().st_mtime_ns)
+    for old in versions[:-keep]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def load_snapshot(src, build, snapshot_dir=None):
+    """Read the snapshot for ``src``, rebuilding it with ``build(src)`` if stale."""
+    df = read_snapshot(src, snapshot_dir)
+    if df is not None:
+        return df
+    df = build(src)
+    try:
+        write_snapshot(df, src, snapshot_dir)
+    except OSError:
+        pass  # read-only deployments just parse the CSV every cold start
+    return df
+
+
+if __name__ == "__main__":
+    from genericbro.catalogue import CATALOGUE_PATH, read_catalogue
+    from genericbro.stores import STORES_PATH, read_stores
+
+    for src, build in ((CATALOGUE_PATH, read_catalogue), (STORES_PATH, read_stores)):
+        print(write_snapshot(build(src), src))
@@ -0,0 +1,16 @@
+"""The Jan Aushadhi Kendra store list (``GenericP.csv``)."""
+import pandas as pd
+
+STORES_PATH = "GenericP.csv"
+
+
+def tidy_stores(df: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case headers, drop stores without coordinates and zero-pad PINs."""
+    df.columns = df.columns.str.strip().str.lower()
+    df = df.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+    df["pin"] = df["pin"].astype(str).str.partition(".")[0].str.zfill(6)
+    return df
+
+
+def read_stores(path=STORES_PATH) -> pd.DataFrame:
+    return tidy_stores(pd.read_csv(path))
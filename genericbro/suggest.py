@@ -0,0 +1,102 @@
+"""Type-ahead completion of catalogue names and formulations.
+
+Every distinct label is keyed by its normalized text ("TAB ATNOBLOK AM" →
+"atnoblok am", see :func:`genericbro.match.normalize`) and by each later word in
+it. The keys live in sorted lists, so the completions of a prefix are a
+binary-searched slice and a keystroke costs the same however large the
+catalogue grows. Labels that start with the prefix rank before those where only
+a later word does; within each, shorter labels come first::
+
+    index = Suggester(df)
+    total, labels = index.complete("name", "amlo", limit=8)
+"""
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from genericbro.catalogue import COL_FORMULATION, COL_NAME
+from genericbro.match import normalize
+
+SUGGESTIONS = 8
+
+_WORD = re.compile(r"[^0-9a-z]+")
+
+
+class Completions(NamedTuple):
+    total: int
+    labels: tuple
+
+
+def _sorted_keys(pairs) -> tuple:
+    pairs = sorted(pairs)
+    return [k for k, _ in pairs], np.fromiter((i for _, i in pairs), dtype=np.intp, count=len(pairs))
+
+
+class PrefixIndex:
+    """Sorted word-start keys over the distinct values of one column, optionally scoped by type."""
+
+    def __init__(self, labels: pd.Series, types: pd.Series = None):
+        text = labels.astype(object)
+        keys = {s: k for s in text.dropna().astype(str).unique() if (k := normalize(s))}
+        # ids in rank order, so sorted ids are ranked ids
+        self.labels = sorted(keys, key=lambda s: (len(keys[s]), keys[s], s))
+        heads, words = [], []
+        for i, label in enumerate(self.labels):
+            key = keys[label]
+            heads.append((key, i))
+            raw = " ".join(_WORD.split(label.lower())).strip()  # with its "tab"/"cap" word, so "tab" alone finds it
+            if raw != key:
+                heads.append((raw, i))
+            at = key.find(" ")
+            while at >= 0:
+                words.append((key[at + 1:], i))
+                at = key.find(" ", at + 1)
+        self._heads, self._head_ids = _sorted_keys(heads)
+        self._words, self._word_ids = _sorted_keys(words)
+
+        self._in_type = {}
+        if types is not None:
+            ids = text.map({label: i for i, label in enumerate(self.labels)})
+            known = ids.notna() & types.notna()
+            for typ, rows in ids[known].astype(np.intp).groupby(types[known].astype(str).to_numpy()):
+                mask = np.zeros(len(self.labels), dtype=bool)
+                mask[rows.to_numpy()] = True
+                self._in_type[typ] = mask
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _ids(self, keys, ids, prefix, mask):
+        found = ids[bisect_left(keys, prefix):bisect_left(keys, prefix + "\uffff")]
+        if mask is not None:
+            found = found[mask[found]]
+        return np.unique(found)
+
+    def complete(self, text, typ=None, limit=SUGGESTIONS) -> Completions:
+        """The best ``limit`` labels starting (or with a word starting) with ``text``, and how many match."""
+        prefix = normalize(text)
+        if not prefix:
+            return Completions(0, ())
+        mask = None
+        if typ is not None:
+            mask = self._in_type.get(str(typ).strip().lower(), np.zeros(len(self.labels), dtype=bool))
+        head = self._ids(self._heads, self._head_ids, prefix, mask)
+        word = np.setdiff1d(self._ids(self._words, self._word_ids, prefix, mask), head, assume_unique=True)
+        top = np.concatenate([head, word])[:limit]
+        return Completions(len(head) + len(word), tuple(self.labels[i] for i in top))
+
+
+class Suggester:
+    """Name and formulation completions of one catalogue; results are memoized per query."""
+
+    def __init__(self, df: pd.DataFrame, cache_size=4096):
+        self.indexes = {kind: PrefixIndex(df[col], df["_type_clean"])
+                        for kind, col in (("name", COL_NAME), ("formulation", COL_FORMULATION))}
+        self.complete = lru_cache(maxsize=cache_size)(self._complete)
+
+    def _complete(self, kind, text, typ=None, limit=SUGGESTIONS) -> Completions:
+        return self.indexes[kind].complete(text, typ, limit)
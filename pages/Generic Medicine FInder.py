@@ -1,19 +1,27 @@
 import streamlit as st
 import pandas as pd
 import re
-
-# ──────────── 1. CONSTANTS ────────────
-COL_NAME, COL_FORMULATION, COL_DOSAGE = "Name", "Formulation", "Dosage"
-COL_TYPE, COL_PRICE_GENERIC = "Type", "Cost of generic"
-COL_PRICE_BRAND, COL_SAVE_PCT = "Cost of branded", "Savings"
-COL_USES, COL_SIDE_EFF = "Uses", "Side effects"
-
+import numpy as np
+from genericbro.catalogue import (
+    COL_NAME, COL_FORMULATION, COL_DOSAGE, COL_PRICE_GENERIC,
+    COL_PRICE_BRAND, COL_SAVE_PCT, COL_USES, COL_SIDE_EFF,
+)
+from genericbro.export import download_buttons
+from genericbro.instrument import page_run, stop
+from genericbro.query import page_count, page_slice
+from genericbro.resources import catalogue
+from genericbro.suggest import SUGGESTIONS
+
+# ──────────── 1. SESSION DEFAULTS ────────────
 st.session_state.setdefault("search_mode", "Medicine name")
 st.session_state.setdefault("run_search", False)
 st.session_state.setdefault("detail_row", None)
+st.session_state.setdefault("name_pick", None)
+st.session_state.setdefault("form_pick", None)
 
 # ──────────── 2. PAGE SETUP + STYLES ────────────
 st.set_page_config(page_title="GENERIC MEDICINE FINDER", layout="wide")
+run = page_run("finder")
 st.markdown("""
 <style>
 :root {
@@ -41,23 +49,12 @@ th,td{padding:6px 4px;font-size:.9rem;}
 """, unsafe_allow_html=True)
 
 # ──────────── 3. LOAD DATA ────────────
-@st.cache_data
-def load_data(path="Final.csv"):
-    df = pd.read_csv(path)
-    df.columns = df.columns.str.strip()
-    rename = {"uses": "Uses", "indications": "Uses", "side effects": "Side effects", "adverse effects": "Side effects"}
-    df.rename(columns={c: rename[c.lower()] for c in df if c.lower() in rename}, inplace=True)
-    df["_form_clean"]   = df[COL_FORMULATION].str.strip().str.lower()
-    df["_dosage_clean"] = df[COL_DOSAGE].astype(str).str.strip().str.lower()
-    df["_type_clean"]   = df[COL_TYPE].str.strip().str.lower()
-    for col in (COL_PRICE_GENERIC, COL_PRICE_BRAND, COL_SAVE_PCT):
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    if COL_SAVE_PCT not in df.columns and {COL_PRICE_GENERIC, COL_PRICE_BRAND}.issubset(df.columns):
-        df[COL_SAVE_PCT] = 100 * (df[COL_PRICE_BRAND] - df[COL_PRICE_GENERIC]) / df[COL_PRICE_BRAND]
-    return df
-
-df = load_data()
+with run.stage("load", cached=True) as s:
+    cat = catalogue()  # one generation per rerun, even if a reload lands mid-run
+    df = cat.df
+    engine = cat.index("query")
+    suggest = cat.index("suggest")
+    s.rows = len(df)
 
 # ──────────── 4. HELPERS ────────────
 def bulletify(txt):
@@ -66,127 +63,169 @@ def bulletify(txt):
     parts = re.split(r"[;,/\n]+", str(txt))
     return "\n".join(f"- {p.strip().capitalize()}" for p in parts if p.strip())
 
-def tidy(d):
-    d = d.drop(columns=[c for c in d.columns if c.startswith("_")], errors="ignore").copy()
-    if COL_SAVE_PCT in d.columns:
-        d[COL_SAVE_PCT] = d[COL_SAVE_PCT].round(1)
-    return d.reset_index(drop=True)
+PAGE_SIZE = 10
+MAX_TEXT_HITS = 500
+TABLE_COLS = [COL_NAME, COL_FORMULATION, COL_DOSAGE, COL_PRICE_GENERIC, COL_PRICE_BRAND, COL_SAVE_PCT]
+TABLE_CONFIG = {
+    COL_PRICE_GENERIC: st.column_config.NumberColumn("Generic ₹", format="%.2f"),
+    COL_PRICE_BRAND: st.column_config.NumberColumn("Branded ₹", format="%.2f"),
+    COL_SAVE_PCT: st.column_config.NumberColumn("Savings %", format="%.1f%%"),
+}
 
-def safe_sort(d, col, asc):
-    if col not in d: return d
-    return d.assign(_k=pd.to_numeric(d[col], errors="coerce")).sort_values("_k", ascending=asc).drop(columns="_k")
+def negative_red(v):
+    return "color:red;font-weight:600" if pd.notna(v) and v < 0 else ""
 
-def show_clickable_table(df_: pd.DataFrame, header=None, key_prefix="tbl"):
-    if df_.empty: return
+def show_clickable_table(rows, header=None, key_prefix="tbl"):
+    if not len(rows): return
     if header: st.subheader(header)
-    page_size = 10
-    total_pages = (len(df_) - 1) // page_size + 1
-    current_page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1, key=f"{key_prefix}_page")
-    start_idx = (current_page - 1) * page_size
-    end_idx = start_idx + page_size
-    df_page = df_.iloc[start_idx:end_idx]
-
-    hdr = st.columns([2.5, 2, 2, 2, 2, 2])
-    for col, text in zip(hdr, ["Name", "Formulation", "Dosage", "Generic ₹", "Branded ₹", "Savings %"]):
-        col.markdown(f"*{text}*")
-
-    for i, row in df_page.iterrows():
-        c = st.columns([2.5, 2, 2, 2, 2, 2])
-        if c[0].button(row[COL_NAME], key=f"{key_prefix}_{i}"):
-            st.session_state.detail_row = row.to_dict()
-        c[1].write(row.get(COL_FORMULATION, "—"))
-        c[2].write(row.get(COL_DOSAGE, "—"))
-        c[3].write(row.get(COL_PRICE_GENERIC, "—"))
-        c[4].write(row.get(COL_PRICE_BRAND, "—"))
-        savings = row.get(COL_SAVE_PCT, "—")
-        if isinstance(savings, (int, float)) and not pd.isna(savings):
-            if savings < 0:
-                c[5].markdown(f"<span style='color:red;font-weight:600'>{savings:.1f}%</span>", unsafe_allow_html=True)
-            else:
-                c[5].write(f"{savings:.1f}%")
-        else:
-            c[5].write("—")
-
-    st.caption(f"Showing {start_idx+1} – {min(end_idx, len(df_))} of {len(df_)} results")
+    current_page = st.number_input("Page", min_value=1, max_value=page_count(len(rows), PAGE_SIZE), value=1, step=1, key=f"{key_prefix}_page")
+    start_idx, end_idx, page_rows = page_slice(rows, current_page, PAGE_SIZE)
+
+    view = df.iloc[page_rows][TABLE_COLS].reset_index(drop=True)
+    event = st.dataframe(
+        view.style.map(negative_red, subset=[COL_SAVE_PCT]), hide_index=True,
+        column_config=TABLE_CONFIG, on_select="rerun", selection_mode="single-row",
+        key=f"{key_prefix}_grid_{current_page}",
+    )
+    if event.selection.rows:
+        st.session_state.detail_row = df.iloc[page_rows[event.selection.rows[0]]].to_dict()
+
+    st.caption(f"Showing {start_idx+1} – {end_idx} of {len(rows)} results")
+    download_buttons(lambda: df.iloc[rows][TABLE_COLS], "medicines", f"{key_prefix}_dl")
+
+@st.fragment
+def type_ahead(label, kind, typ_key, key, placeholder):
+    """Search box with the top matches under it; only this fragment reruns while typing.
+
+    The best match stands in until one is picked; text with no match is kept as typed (and finds nothing).
+    """
+    q = st.text_input(label, key=f"{key}_q", type="search", live="300ms", placeholder=placeholder).strip()
+    total, labels = suggest.complete(kind, q, typ_key, SUGGESTIONS)
+    choice = None
+    if labels:
+        shown = f"top {len(labels)} of {total}" if total > len(labels) else f"{total}"
+        choice = st.selectbox(f"Matches ({shown})", labels, index=None, placeholder=f"{labels[0]} (best match)")
+    elif q:
+        st.caption(f"No {kind}s match “{q}”.")
+    picked = choice or (labels[0] if labels else q or None)
+    if picked != st.session_state[key]:
+        st.session_state[key] = picked
+        if choice is not None and st.session_state.run_search:
+            st.rerun()  # an explicit pick refreshes the results; typing waits for Search
 
 # ──────────── 5. UI + FILTERS ────────────
 st.markdown("# GENERIC MEDICINE FINDER")
 st.markdown("## Search & Filters")
 st.markdown("---")
 
-mode_cols = st.columns([0.4, 0.3, 0.3])
+mode_cols = st.columns([0.1, 0.3, 0.3, 0.3])
 with mode_cols[1]:
     if st.button("Name", key="mode_name"):
         st.session_state.search_mode = "Medicine name"
 with mode_cols[2]:
     if st.button("Formulation", key="mode_form"):
         st.session_state.search_mode = "Formulation"
-
-r1 = st.columns([1.2, 1, 1])
-types = sorted(df[COL_TYPE].dropna().unique())
-typ = r1[0].selectbox("Therapeutic Type", ["All"] + types)
-base_df = df if typ == "All" else df[df["_type_clean"] == typ.lower()]
-dosages = sorted(base_df["_dosage_clean"].dropna().unique())
-dose = r1[1].selectbox("Dosage Filter", ["All"] + dosages)
-sort_map = {"Generic price": COL_PRICE_GENERIC, "Branded price": COL_PRICE_BRAND, "Savings %": COL_SAVE_PCT}
-sort_by = r1[2].selectbox("Sort by", list(sort_map))
-
-r2 = st.columns([1.2, 1, 1])
-mode = st.session_state.search_mode
-if mode == "Medicine name":
-    names = sorted(base_df[COL_NAME].dropna().unique())
-    picked = r2[0].selectbox("Branded Medicine", ["— All in Type —"] + names)
-    name_sel = picked != "— All in Type —"
-else:
-    forms_base = base_df if typ == "All" else base_df[base_df["_type_clean"] == typ.lower()]
-    forms = sorted(forms_base[COL_FORMULATION].dropna().unique())
-    picked = r2[0].selectbox("Choose Formulation", ["— select —"] + forms)
-
-ascending = r2[1].radio("Order", ["Low → High", "High → Low"], horizontal=True) == "Low → High"
-if r2[2].button("Search", key="search_btn"):
-    st.session_state.run_search = True
-    st.session_state.detail_row = None
+with mode_cols[3]:
+    if st.button("Keyword", key="mode_text"):
+        st.session_state.search_mode = "Keyword"
+
+with run.stage("filters"):
+    r1 = st.columns([1.2, 1, 1])
+    typ = r1[0].selectbox("Therapeutic Type", ["All"] + engine.types)
+    typ_key = None if typ == "All" else typ
+    dose = r1[1].selectbox("Dosage Filter", ["All"] + list(engine.options("dosage", typ_key)))
+    sort_map = {"Generic price": COL_PRICE_GENERIC, "Branded price": COL_PRICE_BRAND, "Savings %": COL_SAVE_PCT}
+    sort_by = r1[2].selectbox("Sort by", list(sort_map))
+
+    r2 = st.columns([1.2, 1, 1])
+    mode = st.session_state.search_mode
+    if mode == "Medicine name":
+        with r2[0]:
+            type_ahead("Branded Medicine", "name", typ_key, "name_pick", "Start typing, e.g. amlo (empty: all in type)")
+        picked = st.session_state.name_pick
+        name_sel = picked is not None
+    elif mode == "Keyword":
+        picked = r2[0].text_input("Name, molecule, use or side effect", placeholder="e.g. amlo, blood pressure").strip()
+    else:
+        with r2[0]:
+            type_ahead("Choose Formulation", "formulation", typ_key, "form_pick", "Start typing, e.g. telmisartan")
+        picked = st.session_state.form_pick
+
+    ascending = r2[1].radio("Order", ["Low → High", "High → Low"], horizontal=True) == "Low → High"
+    if r2[2].button("Search", key="search_btn"):
+        st.session_state.run_search = True
+        st.session_state.detail_row = None
+
+    with st.expander("Strength"):
+        r3 = st.columns([1, 1, 1])
+        unit = r3[0].selectbox("Unit", engine.strength.units)
+        lo_bound, hi_bound = engine.strength.bounds(unit)
+        lo = r3[1].number_input("From", min_value=0.0, value=lo_bound, key=f"strength_lo_{unit}")
+        hi = r3[2].number_input("To", min_value=0.0, value=hi_bound, key=f"strength_hi_{unit}")
+        strength = None if (lo, hi) == (lo_bound, hi_bound) else (unit, lo, hi)
+        same_strength = st.checkbox("Same-formulation list: same strength only", disabled=mode != "Medicine name")
 
 # ──────────── 6. FILTER + DISPLAY ────────────
 if not st.session_state.run_search:
     st.info("Adjust filters, then click *Search* to view results.")
-    st.stop()
-
-if mode == "Medicine name":
-    hits = base_df if not name_sel else base_df[base_df[COL_NAME] == picked]
-else:
-    if picked == "— select —":
-        st.warning("Please select a formulation.")
-        st.stop()
-    hits = base_df[base_df[COL_FORMULATION].str.lower().str.strip() == picked.strip().lower()]
-
-if dose != "All":
-    hits = hits[hits["_dosage_clean"] == dose]
-
-if hits.empty:
+    stop(run)
+
+if mode == "Formulation" and picked is None:
+    st.warning("Please type and pick a formulation.")
+    stop(run)
+
+if mode == "Keyword" and not picked:
+    st.warning("Please type something to search for.")
+    stop(run)
+
+with run.stage("search") as s:
+    if mode == "Keyword":
+        with run.stage("fulltext_index", cached=True):
+            text_index = cat.index("fulltext")
+        # the dosage and strength filters narrow the matches before the top MAX_TEXT_HITS are cut
+        allowed = None
+        if dose != "All":
+            allowed = engine.by_dosage.get(dose, engine.all_rows[:0])
+        if strength is not None:
+            in_range = engine.strength.range(lo, hi, unit)
+            allowed = in_range if allowed is None else np.intersect1d(allowed, in_range, assume_unique=True)
+        text_total, hit_rows = text_index.search(picked, typ_key, limit=MAX_TEXT_HITS, allowed=allowed)
+        hit_rows = np.asarray(hit_rows, dtype=np.intp)
+    else:
+        hit_rows, same_rows = engine.search(
+            typ_key,
+            None if dose == "All" else dose,
+            picked if mode == "Medicine name" and name_sel else None,
+            picked if mode == "Formulation" else None,
+            sort_map[sort_by],
+            ascending,
+            strength,
+            same_strength,
+        )
+    s.rows = len(hit_rows)
+
+if not len(hit_rows):
     st.warning("No entries match your filters.")
-    st.stop()
-
-same = pd.DataFrame()
-if mode == "Medicine name" and "name_sel" in locals() and name_sel:
-    same = base_df[base_df["_form_clean"].isin(hits["_form_clean"].unique())]
-    if dose != "All":
-        same = same[same["_dosage_clean"] == dose]
+    stop(run)
 
-hits_sorted = tidy(safe_sort(hits, sort_map[sort_by], ascending))
-same_sorted = tidy(safe_sort(same, sort_map[sort_by], ascending))
-
-if mode == "Medicine name":
-    if not name_sel:
-        show_clickable_table(hits_sorted, "Medicines", "generic")
+with run.stage("table"):
+    if mode == "Medicine name":
+        if not name_sel:
+            show_clickable_table(hit_rows, "Medicines", "generic")
+        else:
+            st.subheader("Exact Match")
+            st.markdown(f"*Formulation – {df.at[hit_rows[0], COL_FORMULATION]}*")
+            show_clickable_table(hit_rows, key_prefix="exact")
+            st.subheader("All Medicines with the Same Formulation")
+            show_clickable_table(same_rows, key_prefix="same")
+    elif mode == "Keyword":
+        show_clickable_table(hit_rows, f"Best matches for “{picked}”", key_prefix="text")
+        if text_total > MAX_TEXT_HITS:
+            st.caption(f"Top {MAX_TEXT_HITS} of {text_total} matches, ranked by relevance — refine the search to narrow them down.")
+        else:
+            st.caption("Ranked by relevance; the sort options apply to Name and Formulation searches.")
     else:
-        st.subheader("Exact Match")
-        st.markdown(f"*Formulation – {hits_sorted.at[0, COL_FORMULATION]}*")
-        show_clickable_table(hits_sorted, key_prefix="exact")
-        st.subheader("All Medicines with the Same Formulation")
-        show_clickable_table(same_sorted, key_prefix="same")
-else:
-    show_clickable_table(hits_sorted, f"Medicines with Formulation: {picked}", key_prefix="form")
+        show_clickable_table(hit_rows, f"Medicines with Formulation: {picked}", key_prefix="form")
 
 det = st.session_state.detail_row
 if det:
@@ -200,4 +239,5 @@ if det:
         st.markdown("#### Possible Side Effects")
         st.markdown(side)
 
-st.caption("Click a medicine name to view its details. Adjust filters and hit Search.")
+st.caption("Select a row to view its details. Adjust filters and hit Search.")
+run.finish()
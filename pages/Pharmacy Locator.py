@@ -1,103 +1,52 @@
 # ─────────────────────────────── Imports
-import os, math, re, io
+import os, re
 import streamlit as st
 import pandas as pd
-import folium
-from streamlit_folium import st_folium
 from streamlit_geolocation import streamlit_geolocation
+from genericbro.export import download_buttons
+from genericbro.geo import cached_query, haversine_km
+from genericbro.instrument import page_run, stop
+from genericbro.listing import result_list
+from genericbro.maps import base_map, result_layer, view_for
+from genericbro.resources import stores
 
 # ─────────────────────────────── Setup
 st.set_page_config(page_title="PHARMACY LOCATOR", layout="wide")
-
-GOOGLE_STREET = "https://{s}.google.com/vt/lyrs=m&x={x}&y={y}&z={z}"
-GOOGLE_SATELLITE = "https://{s}.google.com/vt/lyrs=s&x={x}&y={y}&z={z}"
-ATTR = "Google Maps"
-SUBDOMAINS = ["mt0", "mt1", "mt2", "mt3"]
+run = page_run("locator")
 
 def show_map(rows: pd.DataFrame, user_location=None, highlight_name=None, key="map"):
-    fmap = folium.Map(location=[0, 0], zoom_start=2, control_scale=True, tiles=None)
-    folium.TileLayer(GOOGLE_STREET, name="Street View", attr=ATTR, subdomains=SUBDOMAINS).add_to(fmap)
-    folium.TileLayer(GOOGLE_SATELLITE, name="Satellite View", attr=ATTR, subdomains=SUBDOMAINS).add_to(fmap)
-
-    bounds = []
-
+    from streamlit_folium import st_folium  # folium + component: ~0.5 s, only paid once a search has results
+    lats, lons = list(rows["lat"]), list(rows["lon"])
     if user_location:
-        folium.Marker(
-            location=user_location,
-            tooltip="📍 You are here",
-            icon=folium.Icon(color="red", icon="user", prefix="fa")
-        ).add_to(fmap)
-        bounds.append(user_location)
-
-    for _, r in rows.iterrows():
-        color = "orange" if highlight_name and r["name"] == highlight_name else "blue"
-        bounds.append([r["lat"], r["lon"]])
-        folium.Marker(
-            location=[r["lat"], r["lon"]],
-            tooltip=f"{r['name']}\n{r['address']}",
-            icon=folium.Icon(icon="map-marker", prefix="fa", color=color, icon_color="white")
-        ).add_to(fmap)
-
-    if bounds:
-        fmap.fit_bounds(bounds)
-
-    folium.LayerControl(position="topright").add_to(fmap)
-    return st_folium(fmap, height=500, use_container_width=True, key=key)
-
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371
-    φ1, φ2 = map(math.radians, [lat1, lat2])
-    dφ, dλ = map(math.radians, [lat2 - lat1, lon2 - lon1])
-    a = math.sin(dφ/2)**2 + math.cos(φ1)*math.cos(φ2)*math.sin(dλ/2)**2
-    return 2 * R * math.asin(math.sqrt(min(1, max(0, a))))
-
-def gmaps_navigation_link(from_lat, from_lon, to_lat, to_lon):
-    return f"https://www.google.com/maps/dir/{from_lat},{from_lon}/{to_lat},{to_lon}"
-
-@st.cache_data
-def load_db(path="GenericP.csv"):
-    df = pd.read_csv(path)
-    df.columns = df.columns.str.strip().str.lower()
-    df = df.rename(columns={"name": "name", "address": "address", "pin": "pin", "lat": "lat", "lon": "lon"})
-    df = df.dropna(subset=["lat", "lon"])
-    df["pin"] = df["pin"].astype(str).str.split(".").str[0].str.zfill(6)
-    return df
-
-@st.cache_data
-def unique_cities(df):
-    return sorted(df["address"].apply(lambda a: str(a).split(",")[-1].strip().title()).unique())
-
-@st.cache_data
-def pin_centers(df):
-    return df.groupby("pin")[["lat", "lon"]].mean().apply(tuple, axis=1).to_dict()
-
-def pdf_bytes(df):
-    try:
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-        from reportlab.lib.pagesizes import landscape, letter
-        from reportlab.lib import colors
-    except ImportError:
-        return None
-    buf = io.BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=landscape(letter))
-    tbl = Table([df.columns.tolist()] + df.astype(str).values.tolist(), repeatRows=1)
-    tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
-        ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
-        ("FONTSIZE", (0,0), (-1,-1), 8),
-        ("ALIGN", (0,0), (-1,-1), "LEFT")
-    ]))
-    doc.build([tbl])
-    buf.seek(0)
-    return buf.read()
+        lats.append(user_location[0]); lons.append(user_location[1])
+    center, zoom = view_for(lats, lons)
+    # the base map script is identical every rerun and only names the published store file, so the browser
+    # keeps the map (and its fetched stores) and only swaps the results overlay
+    with run.stage("map", rows=len(rows)):
+        return st_folium(
+            base_map(db.index("points"), db.index("points_file")),
+            feature_group_to_add=result_layer(rows, user_location, highlight_name),
+            center=center, zoom=zoom, height=500, use_container_width=True, key=key, returned_objects=[],
+        )
+
+EXPORT_COLS = {"name": "Name", "address": "Address", "district name": "District", "state name": "State",
+               "pin": "PIN", "contact": "Contact", "distance_km": "Distance (km)"}
+
+def export_frame(rows: pd.DataFrame) -> pd.DataFrame:
+    out = rows[[c for c in EXPORT_COLS if c in rows.columns]].rename(columns=EXPORT_COLS)
+    if "Distance (km)" in out:
+        out["Distance (km)"] = out["Distance (km)"].round(2)
+    return out
 
 # ─────────────────────────────── Page Title
 st.markdown("<h1 style='text-align:center; color:#015c68;'>PHARMACY LOCATOR</h1>", unsafe_allow_html=True)
 
 # ─────────────────────────────── Load
-df = load_db()
-cities = unique_cities(df)
-centres = pin_centers(df)
+with run.stage("load", cached=True):
+    db = stores()  # one generation per rerun, even if a reload lands mid-run
+    df = db.df
+    index = db.index("grid")
+    places = db.index("places")
 
 # ─────────────────────────────── Sidebar Filters
 with st.sidebar:
@@ -111,7 +60,7 @@ with st.sidebar:
     city = st.text_input("…or start typing a city", value="").strip()
 
     if 1 <= len(city) < 50:
-        hints = [c for c in cities if c.lower().startswith(city.lower()) and c.lower() != city.lower()][:5]
+        hints = places.suggest_cities(city)
         if hints:
             st.markdown("*Did you mean:* " + ", ".join(hints))
 
@@ -134,27 +83,32 @@ with st.sidebar:
 # ─────────────────────────────── Triggered Search Logic
 if st.session_state.get("search_triggered"):
     if city:
-        rows = df[df["address"].str.contains(city, case=False, na=False)]
+        with run.stage("city_lookup") as s:
+            rows = df.iloc[places.city(city)]
+            s.rows = len(rows)
         if rows.empty:
             st.error("No pharmacies found. Try adjusting city name or filter options.")
         else:
             st.success(f"{len(rows)} pharmacies found in {city.title()}.")
             loc = (user_lat, user_lon) if user_lat is not None and user_lon is not None else None
+            if loc:
+                rows = rows.assign(distance_km=haversine_km(*loc, rows["lat"].to_numpy(), rows["lon"].to_numpy()))
+                rows = rows.sort_values("distance_km", kind="stable")
             show_map(rows, user_location=loc, key="city")
-            for _, row in rows.iterrows():
-                nav = gmaps_navigation_link(user_lat, user_lon, row['lat'], row['lon']) if user_lat and user_lon else "#"
-                st.markdown(f"🏪 [**{row['name']}**]({nav})", unsafe_allow_html=True)
-                st.markdown(f"📍 {row['address']}")
-                st.markdown("---")
-            st.stop()
+            with run.stage("list", rows=len(rows)):
+                result_list(rows, loc, key="city_list")
+            download_buttons(lambda rows=rows: export_frame(rows), "pharmacies", "city_dl")
+            stop(run)
 
     elif pin or area:
         if user_lat is None or user_lon is None:
-            if pin in centres:
-                user_lat, user_lon = centres[pin]
+            if places.centre(pin):
+                user_lat, user_lon = places.centre(pin)
                 st.success(f"Using PIN centroid {pin}: {user_lat:.4f},{user_lon:.4f}")
             elif area:
-                rows = df[df["address"].str.contains(area, case=False, na=False)]
+                with run.stage("area_lookup") as s:
+                    rows = df.iloc[places.locality(area)]
+                    s.rows = len(rows)
                 if not rows.empty:
                     user_lat, user_lon = rows[["lat", "lon"]].mean()
                     st.success(f"Using centroid of {area.title()}.")
@@ -164,23 +118,18 @@ if st.session_state.get("search_triggered"):
                 st.info("Enter city / PIN / locality or enable GPS.")
 
     if user_lat is not None and user_lon is not None:
-        with st.spinner("Finding nearby pharmacies..."):
-            df["distance_km"] = df.apply(lambda r: haversine(user_lat, user_lon, r["lat"], r["lon"]), axis=1)
-            rows = df[df["distance_km"] <= radius_km].sort_values("distance_km")
+        with st.spinner("Finding nearby pharmacies..."), run.stage("radius") as s:
+            rows = index.select(df, *cached_query(index, db.layout, "radius", user_lat, user_lon, radius_km))
+            s.rows = len(rows)
 
         st.markdown(f"<h4 style='color:#015c68;'>🧾 {len(rows)} pharmacies found within {radius_km} km</h4>", unsafe_allow_html=True)
         if rows.empty:
             st.warning("No pharmacies found in this range.")
         else:
             show_map(rows, user_location=(user_lat, user_lon), key="radius")
-            for _, row in rows.iterrows():
-                nav = gmaps_navigation_link(user_lat, user_lon, row['lat'], row['lon']) if user_lat and user_lon else "#"
-                st.markdown(f"🏪 [**{row['name']}**]({nav})", unsafe_allow_html=True)
-                st.markdown(f"📍 {row['address']}")
-                st.markdown(f"🛣️ Distance: `{row['distance_km']:.2f} km`")
-                st.markdown("---")
-
-            dl1, dl2 = st.columns(2)
-            pdf = pdf_bytes(rows)
-            if pdf: dl1.download_button("Download PDF", pdf, "pharmacies.pdf", "application/pdf", key="pdf2")
-            dl2.download_button("Download CSV", rows.to_csv(index=False).encode(), "pharmacies.csv", "text/csv", key="csv2")
+            with run.stage("list", rows=len(rows)):
+                result_list(rows, (user_lat, user_lon), key="radius_list")
+
+            download_buttons(lambda rows=rows: export_frame(rows), "pharmacies", "radius_dl")
+
+run.finish()
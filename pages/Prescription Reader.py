@@ -1,18 +1,18 @@
 import streamlit as st
 import pandas as pd
-import re
-from PIL import Image
-import pytesseract
-from pdf2image import convert_from_bytes
-from difflib import get_close_matches
+from genericbro.catalogue import (
+    COL_NAME, COL_FORMULATION, COL_DOSAGE, COL_TYPE, COL_PRICE_GENERIC,
+    COL_PRICE_BRAND, COL_SAVE_PCT, COL_USES, COL_SIDE_EFF,
+)
+from genericbro.instrument import page_run
+from genericbro.resources import catalogue
+from genericbro.ocr import cached_ocr_document
+from genericbro.prescription import clean_lines, match_positions
 
 # ─────────────────────────────────────────────────────────────
 # 1. CONSTANTS
 # ─────────────────────────────────────────────────────────────
-COL_NAME, COL_FORMULATION, COL_DOSAGE = "Name", "Formulation", "Dosage"
-COL_TYPE, COL_PRICE_GENERIC = "Type", "Cost of generic"
-COL_PRICE_BRAND, COL_SAVE_PCT = "Cost of branded", "Savings"
-COL_USES, COL_SIDE_EFF = "Uses", "Side effects"
+OCR_DPI, OCR_MAX_PAGES = 200, 10
 
 # ─────────────────────────────────────────────────────────────
 # 2. SESSION DEFAULTS
@@ -25,6 +25,7 @@ st.session_state.setdefault("detail_row", None)
 # 3. PAGE CONFIG & CSS
 # ─────────────────────────────────────────────────────────────
 st.set_page_config(page_title="GENERIC MEDICINE FINDER", layout="wide")
+run = page_run("reader")
 st.markdown("""
 <style>
 section.main > div > div > div > div{
@@ -59,28 +60,11 @@ div.stButton > button:hover{
 # ─────────────────────────────────────────────────────────────
 # 4. LOAD DATA
 # ─────────────────────────────────────────────────────────────
-@st.cache_data
-def load_data(path="Final.csv"):
-    df = pd.read_csv(path)
-    df.columns = df.columns.str.strip()
-    df = df[df["Name"].str.lower() != "name"]  # Remove duplicate headers
-
-    rename = {"uses": "Uses", "indications": "Uses", "side effects": "Side effects", "adverse effects": "Side effects"}
-    df.rename(columns={c: rename[c.lower()] for c in df if c.lower() in rename}, inplace=True)
-
-    df["_form_clean"] = df[COL_FORMULATION].astype(str).str.strip().str.lower()
-    df["_dosage_clean"] = df[COL_DOSAGE].astype(str).str.strip().str.lower()
-    df["_type_clean"] = df[COL_TYPE].astype(str).str.strip().str.lower()
-
-    for col in (COL_PRICE_GENERIC, COL_PRICE_BRAND, COL_SAVE_PCT):
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    if COL_SAVE_PCT not in df.columns and {COL_PRICE_GENERIC, COL_PRICE_BRAND}.issubset(df.columns):
-        df[COL_SAVE_PCT] = 100 * (df[COL_PRICE_BRAND] - df[COL_PRICE_GENERIC]) / df[COL_PRICE_BRAND]
-
-    return df
-
-df = load_data()
+with run.stage("load", cached=True):
+    cat = catalogue()  # one generation per rerun, even if a reload lands mid-run
+    df = cat.df
+    matcher = cat.index("matcher")
+    groups = cat.index("groups")
 
 # ─────────────────────────────────────────────────────────────
 # 5. UPLOAD PRESCRIPTION & SMART MATCHING
@@ -90,13 +74,14 @@ file = st.file_uploader("Upload a prescription file", type=["pdf", "png"])
 
 if file is not None:
     text = ""
+    data = file.getvalue()
     try:
-        if file.type == "application/pdf":
-            pages = convert_from_bytes(file.read())
-            text = "\n".join([pytesseract.image_to_string(page) for page in pages])
-        elif file.type.startswith("image/"):
-            image = Image.open(file)
-            text = pytesseract.image_to_string(image)
+        with st.spinner("Reading prescription..."), run.stage("ocr", cached=True) as s:
+            # shared with other workers and restarts, keyed by the upload's content hash
+            ocr = cached_ocr_document(data, file.type == "application/pdf", OCR_DPI, OCR_MAX_PAGES)
+            s.rows = len(ocr.pages)
+        text = ocr.text
+        st.caption(" · ".join(f"Page {p.page}: {p.seconds:.2f}s" for p in ocr.pages))
     except Exception as e:
         st.error(f"❌ Error extracting text: {e}")
 
@@ -104,58 +89,38 @@ if file is not None:
         st.markdown("#### 📝 Extracted Text from File")
         st.text(text)
 
-        # Clean text: remove numbers and punctuation
-        cleaned_lines = []
-        for line in text.splitlines():
-            line = re.sub(r"[0-9]+", "", line)
-            line = re.sub(r"[^\w\s]", "", line)
-            line = line.strip().lower()
-            if line:
-                cleaned_lines.append(line)
-
-        all_meds = df[COL_NAME].dropna().str.lower().tolist()
-        matches = set()
-
-        for line in cleaned_lines:
-            for word in line.split():
-                if not word.isalpha():
-                    continue
-                if word in all_meds:
-                    matches.add(word)
-                else:
-                    close = get_close_matches(word, all_meds, n=1, cutoff=0.85)
-                    if close:
-                        matches.add(close[0])
-
-        matched = df[df[COL_NAME].str.lower().isin(matches)]
-
-        if not matched.empty:
-            st.markdown("### ✅ Matched Generic Medicines")
-
-            for idx, row in matched.iterrows():
-                with st.expander(f"💊 {row[COL_NAME]} ({row[COL_DOSAGE]}) – {row[COL_FORMULATION]}"):
-                    st.markdown(f"**Type:** {row[COL_TYPE]}")
-                    if pd.notna(row.get(COL_PRICE_GENERIC)):
-                        st.markdown(f"💸 **Generic Cost:** ₹{row[COL_PRICE_GENERIC]:.2f}")
-                    if pd.notna(row.get(COL_PRICE_BRAND)):
-                        st.markdown(f"🏷️ **Branded Cost:** ₹{row[COL_PRICE_BRAND]:.2f}")
-                    if pd.notna(row.get(COL_SAVE_PCT)):
-                        st.markdown(f"💰 **Savings:** {row[COL_SAVE_PCT]:.2f}%")
-                    if pd.notna(row.get(COL_USES)):
-                        st.markdown(f"🩺 **Uses:** {row[COL_USES]}")
-                    if pd.notna(row.get(COL_SIDE_EFF)):
-                        st.markdown(f"⚠️ **Side Effects:** {row[COL_SIDE_EFF]}")
-
-                # Show alternative brands with same formulation (outside expander)
-                same_form_df = df[
-                    (df[COL_FORMULATION].astype(str).str.lower().str.strip() == str(row[COL_FORMULATION]).lower().strip())
-                    & (df[COL_NAME] != row[COL_NAME])
-                ]
-                if not same_form_df.empty:
-                    show_alt = st.checkbox(f"🔁 Show other medicines with same formulation for {row[COL_NAME]}", key=f"alt_{idx}")
-                    if show_alt:
-                        for _, alt in same_form_df.iterrows():
-                            st.markdown(f"- **{alt[COL_NAME]}** ({alt[COL_DOSAGE]})")
-        else:
-            st.warning("No medicines matched from extracted names.")
-
+        with run.stage("match") as s:
+            matched = df.iloc[match_positions(clean_lines(ocr.confident_text()), matcher)]
+            s.rows = len(matched)
+
+        with run.stage("render", rows=len(matched)):
+            if not matched.empty:
+                st.markdown("### ✅ Matched Generic Medicines")
+
+                for idx, row in matched.iterrows():
+                    with st.expander(f"💊 {row[COL_NAME]} ({row[COL_DOSAGE]}) – {row[COL_FORMULATION]}"):
+                        st.markdown(f"**Type:** {row[COL_TYPE]}")
+                        if pd.notna(row.get(COL_PRICE_GENERIC)):
+                            st.markdown(f"💸 **Generic Cost:** ₹{row[COL_PRICE_GENERIC]:.2f}")
+                        if pd.notna(row.get(COL_PRICE_BRAND)):
+                            st.markdown(f"🏷️ **Branded Cost:** ₹{row[COL_PRICE_BRAND]:.2f}")
+                        if pd.notna(row.get(COL_SAVE_PCT)):
+                            st.markdown(f"💰 **Savings:** {row[COL_SAVE_PCT]:.2f}%")
+                        if pd.notna(row.get(COL_USES)):
+                            st.markdown(f"🩺 **Uses:** {row[COL_USES]}")
+                        if pd.notna(row.get(COL_SIDE_EFF)):
+                            st.markdown(f"⚠️ **Side Effects:** {row[COL_SIDE_EFF]}")
+
+                    # Show alternative brands with same formulation (outside expander), cheapest generic first
+                    same_form_df = df.loc[groups.alternatives(idx)]
+                    same_form_df = same_form_df[same_form_df[COL_NAME] != row[COL_NAME]]
+                    if not same_form_df.empty:
+                        show_alt = st.checkbox(f"🔁 Show other medicines with same formulation for {row[COL_NAME]}", key=f"alt_{idx}")
+                        if show_alt:
+                            for _, alt in same_form_df.iterrows():
+                                price = f" – ₹{alt[COL_PRICE_GENERIC]:.2f} generic" if pd.notna(alt[COL_PRICE_GENERIC]) else ""
+                                st.markdown(f"- **{alt[COL_NAME]}** ({alt[COL_DOSAGE]}){price}")
+            else:
+                st.warning("No medicines matched from extracted names.")
+
+run.finish()
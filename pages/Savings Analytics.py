@@ -0,0 +1,98 @@
+import streamlit as st
+from genericbro.catalogue import (
+    COL_NAME, COL_FORMULATION, COL_DOSAGE, COL_PRICE_GENERIC, COL_PRICE_BRAND, COL_SAVE_PCT,
+)
+from genericbro.export import download_buttons
+from genericbro.instrument import page_run, stop
+from genericbro.query import page_count, page_slice
+from genericbro.resources import catalogue
+
+# ──────────── 1. PAGE SETUP + STYLES ────────────
+st.set_page_config(page_title="SAVINGS ANALYTICS", layout="wide")
+run = page_run("analytics")
+st.markdown("""
+<style>
+:root {
+  --primary-color: #02899d;
+  --primary-dark-color: #015c68;
+}
+h1, h2 { text-align:center; }
+h1 { color: var(--primary-dark-color); }
+h2, h3 { color: var(--primary-color); }
+div[data-testid="stMetric"]{
+  border:1px solid #ddd; border-radius:12px; padding:12px 16px;
+  box-shadow: 0 4px 12px rgba(2,137,157,0.1);
+}
+</style>
+""", unsafe_allow_html=True)
+
+# ──────────── 2. LOAD DATA ────────────
+with run.stage("load", cached=True) as s:
+    cat = catalogue()  # aggregates are built with the generation, so they always match its rows
+    df = cat.df
+    summary = cat.index("analytics")
+    s.rows = len(df)
+
+PAGE_SIZE = 25
+PRODUCT_COLS = [COL_NAME, COL_FORMULATION, COL_DOSAGE, COL_PRICE_GENERIC, COL_PRICE_BRAND, COL_SAVE_PCT]
+SAVE_CONFIG = {
+    "Median savings %": st.column_config.NumberColumn(format="%.1f%%"),
+    "Max savings %": st.column_config.NumberColumn(format="%.1f%%"),
+    "Generic ₹": st.column_config.NumberColumn(format="%.2f"),
+    COL_PRICE_GENERIC: st.column_config.NumberColumn("Generic ₹", format="%.2f"),
+    COL_PRICE_BRAND: st.column_config.NumberColumn("Branded ₹", format="%.2f"),
+    COL_SAVE_PCT: st.column_config.NumberColumn("Savings %", format="%.1f%%"),
+}
+
+def picked_row(table, key):
+    """Position of the row selected in a single-row-select table, or ``None``."""
+    event = st.dataframe(table, hide_index=True, column_config=SAVE_CONFIG,
+                         on_select="rerun", selection_mode="single-row", key=key)
+    return event.selection.rows[0] if event.selection.rows else None
+
+# ──────────── 3. OVERVIEW ────────────
+st.markdown("# SAVINGS ANALYTICS")
+st.markdown("## Generic vs branded, by therapeutic type")
+st.markdown("---")
+
+with run.stage("overview") as s:
+    m = st.columns(4)
+    m[0].metric("Products", f"{summary.overall['products']:,}")
+    m[1].metric("Therapeutic types", len(summary.types))
+    m[2].metric("Median savings", f"{summary.overall['median_savings_pct']:.1f}%")
+    m[3].metric("Max savings", f"{summary.overall['max_savings_pct']:.1f}%")
+
+    st.subheader("By therapeutic type")
+    row = picked_row(summary.types, "types_grid")
+    s.rows = len(summary.types)
+
+if row is None:
+    st.caption("Select a type to see its formulations.")
+    stop(run)
+
+# ──────────── 4. DRILL-DOWN ────────────
+with run.stage("drill") as s:
+    typ = summary.types["Type"].iat[row]
+    forms = summary.formulations(typ)
+    st.subheader(f"Formulations in {typ}")
+    st.caption("Best median saving first; the cheapest generic is the lowest generic price for that formulation.")
+    row = picked_row(forms.reset_index(drop=True), f"forms_grid_{typ}")
+    s.rows = len(forms)
+
+if row is None:
+    st.caption("Select a formulation to list its products.")
+    stop(run)
+
+with run.stage("products") as s:
+    form = forms.index[row]
+    rows = summary.products(typ, form)
+    st.subheader(f"Products: {forms['Formulation'].iat[row]}")
+    current_page = st.number_input("Page", min_value=1, max_value=page_count(len(rows), PAGE_SIZE), value=1, step=1,
+                                   key=f"products_page_{typ}_{form}")
+    start_idx, end_idx, page_rows = page_slice(rows, current_page, PAGE_SIZE)
+    st.dataframe(df.iloc[page_rows][PRODUCT_COLS], hide_index=True, column_config=SAVE_CONFIG)
+    st.caption(f"Showing {start_idx+1} – {end_idx} of {len(rows)} products, cheapest generic first")
+    download_buttons(lambda rows=rows: df.iloc[rows][PRODUCT_COLS], "savings", "products_dl")
+    s.rows = len(rows)
+
+run.finish()
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from genericbro.analytics import SavingsSummary
+from genericbro.catalogue import COL_FORMULATION, COL_NAME, tidy_catalogue
+from genericbro.equivalence import FormulationGroups
+
+
+def catalogue(rows):
+    raw = pd.DataFrame(rows, columns=["Name", "Formulation", "Dosage", "Type", "Cost of generic", "Cost of branded"])
+    return tidy_catalogue(raw)
+
+
+def test_products_skip_rows_without_formulation():
+    # a typed product with a blank formulation sits before the formulation groups in sort order
+    df = catalogue([
+        ["TAB BLANK", None, "5 mg", "A", 1.0, 2.0],
+        ["TAB AMLO", "Amlodipine 5mg", "5 mg", "A", 3.0, 9.0],
+        ["TAB AMLOKIND", "Amlodipine 5mg", "5 mg", "A", 2.0, 8.0],
+        ["TAB ATOR", "Atorvastatin 10mg", "10 mg", "A", 5.0, 20.0],
+        ["TAB TELMI", "Telmisartan 40mg", "40 mg", "B", 4.0, 10.0],
+    ])
+    summary = SavingsSummary(df, FormulationGroups(df))
+    for typ in ("A", "B"):
+        forms = summary.formulations(typ)
+        for key in forms.index:
+            rows = summary.products(typ, key)
+            assert len(rows) == forms.at[key, "Products"]
+            assert set(df[COL_FORMULATION].iloc[rows].str.lower().str.replace(" ", "")) == {key.replace(" ", "")}
+    amlo = summary.products("A", "amlodipine 5mg")
+    assert df[COL_NAME].iloc[amlo].tolist() == ["TAB AMLOKIND", "TAB AMLO"]  # cheapest generic first
+    assert summary.types.set_index("Type").at["A", "Products"] == 4
+    assert np.array_equal(summary.products("B", "telmisartan 40mg"), [4])
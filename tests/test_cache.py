@@ -0,0 +1,116 @@
+import pickle
+import sqlite3
+
+import numpy as np
+import pytest
+
+from genericbro import cache
+from genericbro.cache import MISSING, SqliteTier
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+def stored_bytes(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+
+def blob_size(value):
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_ttl_expires_entries(tmp_path, clock):
+    tier = SqliteTier(tmp_path / "c.db")
+    tier.set("short", 1, ttl=10)
+    tier.set("forever", 2)
+    assert tier.get("short") == (True, 1)
+    clock.now += 11
+    assert tier.get("short") == MISSING
+    assert tier.get("forever") == (True, 2)
+    assert tier.size() == stored_bytes(tmp_path / "c.db")
+
+
+def test_expired_rows_are_swept_periodically(tmp_path, clock):
+    tier = SqliteTier(tmp_path / "c.db", sweep_seconds=60)
+    for i in range(5):
+        tier.set(f"k{i}", i, ttl=1)
+    clock.now += 30
+    tier.set("new", 0)  # within the sweep interval: expired rows stay until the next sweep
+    assert stored_bytes(tmp_path / "c.db") == 6 * blob_size(0)
+    clock.now += 31
+    tier.set("newer", 0)
+    assert tier.size() == stored_bytes(tmp_path / "c.db") == 2 * blob_size(0)
+
+
+def test_evicts_least_recently_read_first(tmp_path, clock):
+    value = np.zeros(100, dtype=np.int64)
+    size = blob_size(value)
+    tier = SqliteTier(tmp_path / "c.db", max_bytes=10 * size, touch_seconds=5)
+    for i in range(10):
+        clock.now += 1
+        tier.set(f"k{i}", value)
+    clock.now += 10
+    assert tier.get("k0")[0]  # read long after it was written, so it becomes the most recent
+    clock.now += 1
+    tier.set("k10", value)
+    keys = {k for k in (f"k{i}" for i in range(11)) if tier.get(k)[0]}
+    # over budget: the oldest reads are dropped down to 90% in one batch
+    assert keys == {"k0"} | {f"k{i}" for i in range(3, 11)}
+    assert tier.evictions == 2
+    assert tier.size() == stored_bytes(tmp_path / "c.db") <= tier.max_bytes
+
+
+def test_reads_only_touch_stale_access_times(tmp_path, clock):
+    tier = SqliteTier(tmp_path / "c.db", touch_seconds=60)
+    tier.set("k", 1)
+    written = clock.now
+    accessed = lambda: sqlite3.connect(tmp_path / "c.db").execute("SELECT accessed FROM cache").fetchone()[0]
+    clock.now += 30
+    tier.get("k")
+    assert accessed() == written
+    clock.now += 31
+    tier.get("k")
+    assert accessed() == clock.now
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_size_counter_tracks_every_write(tmp_path, clock, seed):
+    rng = np.random.default_rng(seed)
+    path = tmp_path / "c.db"
+    tiers = [SqliteTier(path, max_bytes=20_000, sweep_seconds=0) for _ in range(2)]  # two processes, one file
+    for _ in range(300):
+        tier = tiers[rng.integers(2)]
+        key = f"k{rng.integers(40)}"
+        clock.now += float(rng.uniform(0, 2))
+        op = rng.random()
+        if op < 0.6:
+            tier.set(key, b"x" * int(rng.integers(0, 2000)), ttl=None if rng.random() < 0.5 else float(rng.uniform(1, 20)))
+        elif op < 0.95:
+            tier.get(key)
+        else:
+            tier.clear()
+        assert tier.size() == stored_bytes(path) <= 20_000
+
+
+def test_existing_cache_files_are_upgraded(tmp_path, clock):
+    path = tmp_path / "c.db"
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE cache (key TEXT PRIMARY KEY, value BLOB, size INTEGER, expires REAL, accessed REAL)")
+        db.execute("INSERT INTO cache VALUES ('old', ?, 7, NULL, 0)", (pickle.dumps("old"),))
+    tier = SqliteTier(path)
+    assert tier.size() == 7 and tier.get("old") == (True, "old")
+    tier.set("new", 1)
+    assert tier.size() == stored_bytes(path)
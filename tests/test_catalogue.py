@@ -0,0 +1,20 @@
+import pandas as pd
+
+from genericbro.catalogue import COL_FORMULATION, COL_TYPE, tidy_catalogue
+
+
+def test_clean_columns_accept_categorical_and_non_string_values():
+    raw = pd.DataFrame({
+        "Name": ["TAB A", "TAB B", "TAB C", "TAB D"],
+        "Formulation": [" Amlodipine 5mg", 500, None, 2.5],  # numbers from a spreadsheet column
+        "Dosage": ["5 mg", "500 mg", "1 mg", "2.5 mg"],
+        "Type": pd.Categorical(["A- Anti Diabetic ", "B - Anti Hypertensive", None, "A- Anti Diabetic "]),
+        "Cost of generic": [1, 2, 3, 4], "Cost of branded": [2, 4, 6, 8],
+    })
+    df = tidy_catalogue(raw)
+    assert df["_form_clean"].astype(object).where(df["_form_clean"].notna(), None).tolist() == [
+        "amlodipine 5mg", "500", None, "2.5"]
+    assert df["_type_clean"].astype(object).where(df["_type_clean"].notna(), None).tolist() == [
+        "a- anti diabetic", "b - anti hypertensive", None, "a- anti diabetic"]
+    assert df["_type_clean"].dtype == "category" and df[COL_TYPE].notna().sum() == 3
+    assert df[COL_FORMULATION].notna().sum() == 3
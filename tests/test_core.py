@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pytest
+
+from genericbro.core import Core
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def core():
+    return Core(ROOT / "Final.csv", ROOT / "GenericP.csv", poll_seconds=0)
+
+
+def test_search_frame_matches_search(core):
+    name = core.catalogue["Name"].iat[0]
+    queries = [{}, {"name": name}, {"name": name, "same_strength": True}, {"dosage": "500 mg", "sort": "savings"},
+               {"typ": core.catalogue["Type"].dropna().iat[0], "strength": ("mg", 10, 100), "same_strength": True}]
+    for q in queries:
+        result = core.search(**q, page_size=10)
+        frame = core.search_frame(**q)
+        assert len(frame) == result["total"]
+        assert frame["name"].head(10).tolist() == [r["name"] for r in result["results"]]
+
+
+
+def test_nearby_total_counts_past_the_limit(core):
+    lat, lon = core.stores[["lat", "lon"]].iloc[0]
+    out = core.nearby(lat, lon, radius_km=50, limit=3)
+    assert len(out["results"]) == 3 < out["total"]
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from genericbro.dosage import StrengthIndex, dosage_label, parse_dosages
+
+
+@pytest.mark.parametrize("text, strength, unit, per_ml, label", [
+    ("1 mg", 1.0, "mg", None, "1 mg"),
+    ("3mg", 3.0, "mg", None, "3 mg"),
+    ("500 MG/5ML", 500.0, "mg", 5.0, "500 mg/5 ml"),
+    ("5 mg/ml", 5.0, "mg", 1.0, "5 mg/ml"),
+    ("25 mcg", 0.025, "mg", None, "25 mcg"),
+    ("1 g", 1000.0, "mg", None, "1 g"),
+    ("100 IU", 100.0, "IU", None, "100 IU"),
+    ("2 % w/v", 2.0, "%", None, "2%"),
+    ("10", 10.0, "", None, "10"),
+    ("Calamine  Lotion", None, "", None, "calamine lotion"),
+])
+def test_parse_dosages(text, strength, unit, per_ml, label):
+    row = parse_dosages(pd.Series([text])).iloc[0]
+    assert np.isnan(row["_strength"]) if strength is None else row["_strength"] == pytest.approx(strength)
+    assert row["_unit"] == unit
+    assert np.isnan(row["_per_ml"]) if per_ml is None else row["_per_ml"] == per_ml
+    assert row["_dosage_clean"] == label
+
+
+def test_parse_dosages_keeps_index_and_missing_rows():
+    out = parse_dosages(pd.Series(["1 mg", None, "1mg", np.nan], index=[10, 11, 12, 13]))
+    assert out.index.tolist() == [10, 11, 12, 13]
+    assert out["_dosage_clean"].tolist()[::2] == ["1 mg", "1 mg"]
+    assert out["_dosage_clean"].isna().tolist() == [False, True, False, True]
+
+
+def test_labels_parse_back_to_the_same_strength():
+    texts = pd.Series(["1 mg", "0.5MG", "500 MG/5ML", "25 mcg", "1.5 g", "100 IU", "1 %", "2 mg per 1 ml", "Gel"])
+    parsed = parse_dosages(texts)
+    again = parse_dosages(parsed["_dosage_clean"].astype(object))
+    assert [dosage_label(label) for label in parsed["_dosage_clean"]] == parsed["_dosage_clean"].tolist()
+    for col in ("_strength", "_per_ml"):
+        assert np.allclose(parsed[col], again[col], equal_nan=True)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_strength_range_matches_a_scan(seed):
+    rng = np.random.default_rng(seed)
+    texts = rng.choice(["0.5 mg", "1 mg", "25 mcg", "0.025 mg", "1 g", "500 mg/5 ml", "100 IU", "Syrup", None], 200)
+    df = parse_dosages(pd.Series(texts, dtype=object))
+    index = StrengthIndex(df)
+    lo, hi = sorted(rng.choice([0.025, 0.5, 1.0, 100.0, 1000.0], 2))
+    mg = (df["_unit"] == "mg").to_numpy() & df["_per_ml"].isna().to_numpy()
+    strength = df["_strength"].to_numpy()
+    assert index.range(lo, hi, "mg").tolist() == np.flatnonzero(mg & (strength >= lo) & (strength <= hi)).tolist()
+    for row in rng.integers(0, len(df), 10):
+        expected = np.flatnonzero(mg & (strength == strength[row])) if mg[row] else index.same(row)
+        assert index.same(row).tolist() == expected.tolist()
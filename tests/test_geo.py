@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from genericbro.geo import StoreIndex, haversine_km
+
+
+def brute_radius(index, lat, lon, radius_km):
+    dist = haversine_km(lat, lon, index.lat, index.lon)
+    return set(np.flatnonzero(dist <= radius_km).tolist())
+
+
+def check(index, lat, lon, radius_km, k=7):
+    pos, dist = index.radius(lat, lon, radius_km)
+    assert set(pos.tolist()) == brute_radius(index, lat, lon, radius_km)
+    assert np.all(np.diff(dist) >= 0)
+    assert np.allclose(dist, haversine_km(lat, lon, index.lat[pos], index.lon[pos]))
+
+    pos, dist = index.nearest(lat, lon, k)
+    expected = np.sort(haversine_km(lat, lon, index.lat, index.lon))[:k]
+    assert np.allclose(dist, expected)
+    assert np.allclose(haversine_km(lat, lon, index.lat[pos], index.lon[pos]), dist)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_brute_force_over_india(seed):
+    rng = np.random.default_rng(seed)
+    index = StoreIndex(rng.uniform(8, 35, 2000), rng.uniform(68, 97, 2000))
+    for _ in range(20):
+        check(index, rng.uniform(6, 37), rng.uniform(66, 99), rng.choice([0.5, 5, 20, 150]))
+
+
+@pytest.mark.parametrize("cell_deg", [0.25, 1.0])
+def test_points_on_cell_edges(cell_deg):
+    # stores and queries sitting exactly on grid lines, where floor() decides the cell
+    grid = np.arange(-2, 2.01, cell_deg)
+    lat, lon = (a.ravel() for a in np.meshgrid(20 + grid, 77 + grid))
+    index = StoreIndex(np.concatenate([lat, lat + 1e-9]), np.concatenate([lon, lon - 1e-9]), cell_deg=cell_deg)
+    for qlat in 20 + grid[::2]:
+        for qlon in 77 + grid[::2]:
+            for r in (cell_deg * 111.195, 27.8, 1e-6):
+                check(index, qlat, qlon, r)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_antimeridian_and_poles(seed):
+    rng = np.random.default_rng(seed)
+    lat = np.concatenate([rng.uniform(-90, 90, 300), rng.uniform(85, 90, 300), rng.uniform(-90, -85, 300)])
+    lon = np.concatenate([rng.choice([-1, 1], 300) * rng.uniform(175, 180, 300), rng.uniform(-180, 180, 600)])
+    index = StoreIndex(lat, lon)
+    for qlat, qlon in [(0, 179.9), (0, -179.9), (89.5, 0), (-89.5, 120), (90, 0), (-90, 0), (88, 179.99), (60, 180)]:
+        for r in (10, 60, 150, 600):
+            check(index, qlat, qlon, r)
+    for _ in range(20):
+        check(index, rng.uniform(80, 90) * rng.choice([-1, 1]), rng.uniform(-180, 180), rng.uniform(1, 400))
+
+
+def test_empty_and_small_indexes():
+    empty = StoreIndex([], [])
+    assert len(empty.radius(20, 77, 10)[0]) == 0 and len(empty.nearest(20, 77)[0]) == 0
+    one = StoreIndex([20.0], [77.0])
+    assert one.nearest(0, 0, 5)[0].tolist() == [0]
@@ -0,0 +1,43 @@
+import difflib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from genericbro.match import MedicineMatcher, normalize
+
+NAMES = pd.Series(["TAB AMLODIPINE 5", "TAB AMLOKIND AT", "TAB ATORVA 10", "CAP OMEPRAZOLE 20", "TAB TELMA 40",
+                   "TAB TELMA H", "SYP CROCIN", "TAB METFORMIN 500", "TAB GLIMDA 1", None, ""])
+
+
+def typo(rng, word):
+    i = int(rng.integers(len(word)))
+    return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + "x" + word[i:]
+
+
+def test_best_agrees_with_difflib():
+    matcher = MedicineMatcher(NAMES, shortlist=len(NAMES))
+    rng = np.random.default_rng(0)
+    keys = [normalize(n) for n in NAMES if isinstance(n, str) and normalize(n)]
+    for _ in range(200):
+        query = typo(rng, keys[rng.integers(len(keys))])
+        expected = difflib.get_close_matches(normalize(query), keys, n=1, cutoff=0.85)
+        found = matcher.best(query, 0.85)
+        assert (found[0] if found else None) == (expected[0] if expected else None)
+
+
+def test_match_lines_finds_phrases_with_their_rows():
+    matcher = MedicineMatcher(NAMES)
+    matches = matcher.match_lines(["Tab Telma 40 1-0-1", "syp crocin", "take rest"])
+    assert [(m.key, m.positions) for m in matches] == [("telma 40", (4,)), ("crocin", (6,))]
+
+
+def test_shared_memo_is_thread_safe():
+    matcher = MedicineMatcher(NAMES)
+    matcher.best = lru_cache(maxsize=8)(matcher._best)  # a tiny memo, so threads evict each other's entries
+    queries = [f"{n} {i}" for n in ("telma", "amlokind", "crocin", "atorva") for i in range(50)]
+    expected = [matcher._best(q) for q in queries]
+    with ThreadPoolExecutor(8) as pool:
+        for _ in range(5):
+            assert list(pool.map(matcher.best, queries)) == expected
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from genericbro.places import PlaceIndex
+
+ADDRESSES = [
+    "Jan Aushadhi Store HNo1146410 Collector ChowkAdilabadTelangana5040 01",
+    "57SAI NAGAR, Main Road", "Plot 12 Gandhinagar Colony", "Shop 4, Nehru Nagar Market", "GANDHI ROAD",
+    "Near Bus Stand, Hyderabad", "Sai Baba Temple Road", None, "Opp. Civil Hospital, Sector-12",
+]
+
+
+@pytest.fixture(scope="module")
+def places_df():
+    rng = np.random.default_rng(0)
+    n = len(ADDRESSES)
+    df = pd.DataFrame({
+        "address": ADDRESSES, "district name": ["Adilabad", "Hyderabad", "Gandhinagar", "Hyderabad", "Pune",
+                                                "Hyderabad", None, "Pune", "Chandigarh"],
+        "state name": ["Telangana"] * 4 + ["Maharashtra", "Telangana", "Telangana", "Maharashtra", "Chandigarh"],
+        "pin": [f"{p:06d}" for p in rng.integers(100000, 999999, n)],
+        "lat": rng.uniform(10, 30, n), "lon": rng.uniform(70, 90, n),
+    })
+    return df, PlaceIndex(df)
+
+
+def contains(df, text):
+    return set(np.flatnonzero(df["address"].str.contains(text, case=False, na=False, regex=False)))
+
+
+@pytest.mark.parametrize("word", ["nagar", "Nagar", "sai", "adil", "chowkadilabad", "road", "12", "a", "zzz"])
+def test_single_words_match_like_a_substring_scan(places_df, word):
+    df, places = places_df
+    assert set(places.locality(word).tolist()) == contains(df, word)
+
+
+def test_every_address_substring_is_found(places_df):
+    df, places = places_df
+    for address in df["address"].dropna():
+        for i in range(len(address)):
+            for j in range(i + 1, min(len(address), i + 12) + 1):
+                text = address[i:j]
+                if any(c.isalnum() for c in text):  # punctuation alone is not a search
+                    assert contains(df, text) <= set(places.locality(text).tolist())
+
+
+def test_words_need_not_be_adjacent(places_df):
+    _, places = places_df
+    assert places.locality("road sai").tolist() == [1, 6]
+    assert places.locality("nagar market").tolist() == [3]
+    assert len(places.locality("  ,. ")) == 0
+
+
+def test_city_matches_district_prefix_and_address(places_df):
+    _, places = places_df
+    assert places.city("hyd").tolist() == [1, 3, 5]
+    assert places.city("gandhi").tolist() == [2, 4]  # district "Gandhinagar" plus "GANDHI ROAD"
+    assert places.suggest_cities("Hyd") == ["Hyderabad"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from genericbro import cache
+from genericbro.geo import cached_query
+from genericbro.refresh import STORES, DataSource, apply_delta
+
+KEY = ("code",)
+
+
+def table(codes, values):
+    return pd.DataFrame({"code": codes, "value": values})
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_apply_delta_keeps_surviving_rows_in_place(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(0, 60))
+    old = table([f"K{i}" for i in rng.permutation(n)], rng.integers(0, 5, n))
+    kept = old[rng.random(n) < 0.8]
+    changed = rng.random(len(kept)) < 0.2
+    extra = int(rng.integers(0, 10))
+    new = pd.concat([
+        table(kept["code"], np.where(changed, kept["value"] + 10, kept["value"])),
+        table([f"N{i}" for i in range(extra)], np.zeros(extra, dtype=int)),
+    ]).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+    merged, delta = apply_delta(old, new, KEY)
+    # surviving rows first, in their old order, then the added rows
+    assert merged["code"].tolist()[:len(kept)] == kept["code"].tolist()
+    assert sorted(merged["code"]) == sorted(new["code"])
+    assert dict(zip(merged["code"], merged["value"])) == dict(zip(new["code"], new["value"]))
+    assert (delta.added, delta.removed, delta.changed) == (extra, n - len(kept), int(changed.sum()))
+    assert delta.columns == (frozenset({"value"}) if changed.any() else frozenset())
+
+
+def test_apply_delta_pairs_duplicate_keys_in_order():
+    old = table(["A", "B", "A"], [1, 2, 3])
+    merged, delta = apply_delta(old, table(["B", "A", "A", "A"], [2, 1, 3, 4]), KEY)
+    assert merged["value"].tolist() == [1, 2, 3, 4]
+    assert (delta.added, delta.removed, delta.changed) == (1, 0, 0)
+
+
+def stores(codes, rng):
+    n = len(codes)
+    return pd.DataFrame({
+        "Kendra Code": codes, "Name": [f"Store {c}" for c in codes], "Contact": "", "State Name": "Telangana",
+        "District Name": "Hyderabad", "pin": 500001.0, "Address": [f"{c} Main Road" for c in codes],
+        "lat": 17.4 + rng.normal(0, 0.1, n), "lon": 78.5 + rng.normal(0, 0.1, n),
+    })
+
+
+def test_reloaded_and_fresh_processes_share_geo_cache(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    csv = tmp_path / "GenericP.csv"
+    before = stores([f"PMBJK{i:05d}" for i in range(300)], rng)
+    before.to_csv(csv, index=False)
+    reloaded = DataSource(csv, STORES, snapshot_dir=tmp_path / "a", poll_seconds=0)
+    # the update reorders the file and adds stores, so the two processes lay rows out differently
+    after = pd.concat([before, stores([f"PMBJK{i:05d}" for i in range(300, 350)], rng)]).sample(frac=1, random_state=1)
+    after.to_csv(csv, index=False)
+    assert reloaded.refresh(force=True) is not None
+    fresh = DataSource(csv, STORES, snapshot_dir=tmp_path / "b", poll_seconds=0)
+    a, b = reloaded.current, fresh.current
+    assert a.version == b.version and a.layout != b.layout
+
+    monkeypatch.setattr(cache, "_shared", cache.TieredCache([cache.SqliteTier(tmp_path / "results.db")]))
+    found = []
+    for gen in (a, b, a, b):  # each process fills the shared cache once, then reads its own entry back
+        index = gen.index("grid")
+        rows = index.select(gen.df, *cached_query(index, gen.layout, "radius", 17.4, 78.5, 8))
+        found.append(dict(zip(rows["kendra code"], rows["distance_km"].round(6))))
+    assert found[0] and all(f == found[0] for f in found)
+    assert cache.shared_cache().hits["sqlite"] == 2